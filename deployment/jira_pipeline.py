@@ -1,29 +1,83 @@
 #!/usr/bin/env python3
 
 import boto3
-import json
 import os
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from botocore.config import Config
 from dotenv import load_dotenv
+from source.bedrock.embedding_cache import get_default_cache
+from source.bedrock.embedding_dlq import EmbeddingDeadLetterQueue, retry_dead_letters
+from source.bedrock.embedding_engine import EmbeddingEngine
+from source.bedrock.embedding_profile import DEFAULT_PROFILE
+from source.jira.adf import description_text
 from source.jira.jira_client import JiraClient
+from source.jira.sync_state import SyncWatermark, max_updated, parse_jira_timestamp
+from source.utils.adaptive_limiter import AIMDLimiter, LimitedClient
+from source.utils.business_context import get_default_scorer
+from source.utils.raw_ticket_reader import RawTicketReader
+from source.utils.raw_ticket_writer import RawTicketWriter
+from source.utils.streaming import StreamingPipeline
+from source.utils.text_chunker import TextChunker
+from source.vector_store.chunk_hits import is_chunk_key, ticket_key
+from source.vector_store.embedding_store import (
+    DEFAULT_STORE_PATH, EmbeddingStore, EmbeddingStoreWriter, update_store_metadata, upsert_embedding_store,
+    write_embedding_store
+)
+from source.vector_store.vector_writer import VectorWriter
 
 # Load environment
 load_dotenv()
 
-def test_complete_pipeline():
+# Configuration
+S3_BUCKET = 'financial-jira-vectors-pipeline'
+VECTOR_BUCKET = 'financial-vectors-kb'
+INDEX_NAME = 'jira-tickets-enhanced'
+REGION = 'us-east-1'
+EMBEDDING_WORKERS = int(os.getenv('EMBEDDING_WORKERS', '16'))
+UPLOAD_WORKERS = int(os.getenv('UPLOAD_WORKERS', '32'))
+# 'objects' (one JSON per ticket) or 'jsonl' (gzipped daily shards)
+RAW_TICKET_LAYOUT = os.getenv('RAW_TICKET_LAYOUT', 'objects')
+# 'ticket' (one vector per ticket) or 'chunk' ({key}_title / {key}_desc_{i} vectors)
+VECTOR_GRANULARITY = os.getenv('VECTOR_GRANULARITY', 'ticket')
+CHUNK_MAX_TOKENS = int(os.getenv('CHUNK_MAX_TOKENS', '512'))
+CHUNK_OVERLAP_TOKENS = int(os.getenv('CHUNK_OVERLAP_TOKENS', '48'))
+# Parallel list_vectors segments when re-scoring an index
+RESCORE_SEGMENTS = int(os.getenv('RESCORE_SEGMENTS', '8'))
+# Vector metadata fields derived from business context rules
+CONTEXT_FIELDS = ('marketplace_impact', 'customer_impact', 'urgency_score')
+# Concurrency ceilings: in-flight calls grow toward these until the service throttles
+JIRA_WORKERS = int(os.getenv('JIRA_WORKERS', '16'))
+S3VECTORS_WORKERS = int(os.getenv('S3VECTORS_WORKERS', '8'))
+# Optional requests/second cap on Bedrock, e.g. the account's quota (0 = none)
+BEDROCK_MAX_RPS = float(os.getenv('BEDROCK_MAX_RPS', '0'))
+
+bedrock_limiter = AIMDLimiter('bedrock-runtime', max_limit=EMBEDDING_WORKERS, rate=BEDROCK_MAX_RPS or None)
+s3vectors_limiter = AIMDLimiter('s3vectors', max_limit=S3VECTORS_WORKERS)
+jira_limiter = AIMDLimiter('jira', max_limit=JIRA_WORKERS)
+
+chunker = TextChunker(max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS)
+
+def test_complete_pipeline(chunked=VECTOR_GRANULARITY == 'chunk'):
     """Test the complete pipeline locally"""
     
     print("🚀 Testing Complete Jira → S3 Vectors Pipeline")
     
     # Configuration
-    s3_bucket = 'financial-jira-vectors-pipeline'
-    vector_bucket = 'financial-vectors-kb'
-    region = 'us-east-1'
+    s3_bucket = S3_BUCKET
+    vector_bucket = VECTOR_BUCKET
+    region = REGION
     
     # Initialize clients
-    s3_client = boto3.client('s3', region_name=region)
-    s3vectors_client = boto3.client('s3vectors', region_name=region)
-    bedrock_runtime = boto3.client('bedrock-runtime', region_name=region)
+    s3_client = RawTicketWriter.make_client(region, UPLOAD_WORKERS)
+    s3vectors_client = make_s3vectors_client()
+    bedrock_runtime = make_bedrock_client()
+    embedding_engine = EmbeddingEngine(
+        bedrock_runtime,
+        max_workers=EMBEDDING_WORKERS,
+        cache=get_default_cache()
+    )
+    dead_letters = EmbeddingDeadLetterQueue(s3_client=s3_client)
     
     try:
         # Step 1: Extract Jira tickets
@@ -32,33 +86,18 @@ def test_complete_pipeline():
         jira_client = JiraClient(
             jira_url=os.getenv('JIRA_URL'),
             email=os.getenv('JIRA_EMAIL'),
-            api_token=os.getenv('JIRA_API_TOKEN')
+            api_token=os.getenv('JIRA_API_TOKEN'),
+            max_workers=JIRA_WORKERS,
+            limiter=jira_limiter
         )
         
-        tickets = jira_client.fetch_recent_tickets(limit=1000, days_back=90)
+        tickets = jira_client.fetch_recent_tickets(limit=None, days_back=90)
         print(f"✅ Extracted {len(tickets)} tickets")
         
         # Step 2: Transform tickets with business context
         print("🔄 Step 2: Adding business context...")
         
-        enhanced_tickets = []
-        for ticket in tickets:
-            enhanced_ticket = {
-                'ticket_id': ticket['key'],
-                'summary': ticket['summary'],
-                'description': ticket.get('description', ''),
-                'priority': ticket['priority'],
-                'status': ticket['status'],
-                'assignee': ticket['assignee'],
-                'created_date': ticket['created'],
-                'text': f"{ticket['summary']} {ticket.get('description', '')}",
-                'business_context': {
-                    'marketplace_impact': assess_marketplace_impact(ticket),
-                    'customer_impact': assess_customer_impact(ticket),
-                    'urgency_score': calculate_urgency_score(ticket)
-                }
-            }
-            enhanced_tickets.append(enhanced_ticket)
+        enhanced_tickets = enhance_tickets(tickets)
         
         print(f"✅ Enhanced {len(enhanced_tickets)} tickets with business context")
         
@@ -74,17 +113,10 @@ def test_complete_pipeline():
         # Step 4: Upload raw tickets to S3
         print("📤 Step 4: Uploading tickets to S3...")
         
-        for ticket in enhanced_tickets:
-            key = f"raw-tickets/{datetime.now().strftime('%Y/%m/%d')}/{ticket['ticket_id']}.json"
-            
-            s3_client.put_object(
-                Bucket=s3_bucket,
-                Key=key,
-                Body=json.dumps(ticket),
-                ContentType='application/json'
-            )
+        raw_writer = RawTicketWriter(s3_bucket, s3_client, layout=RAW_TICKET_LAYOUT, max_workers=UPLOAD_WORKERS)
+        upload_report = raw_writer.write(enhanced_tickets)
         
-        print(f"✅ Uploaded {len(enhanced_tickets)} tickets to S3")
+        print(f"✅ Uploaded {upload_report['tickets']} tickets to S3 as {upload_report['objects']} objects ({upload_report['seconds']:.1f}s)")
         
         # Step 5: Create S3 Vector store
         print("🔍 Step 5: Creating S3 Vector store...")
@@ -99,7 +131,7 @@ def test_complete_pipeline():
             s3vectors_client.create_index(
                 vectorBucketName=vector_bucket,
                 indexName='jira-tickets-enhanced',
-                dimension=1024,
+                dimension=DEFAULT_PROFILE.dimensions,
                 distanceMetric='cosine',
                 dataType='float32'
             )
@@ -110,47 +142,49 @@ def test_complete_pipeline():
         # Step 6: Generate embeddings and store vectors
         print("📊 Step 6: Generating embeddings...")
         
-        vectors = []
-        for ticket in enhanced_tickets:
-            # Generate embedding
-            response = bedrock_runtime.invoke_model(
-                modelId='amazon.titan-embed-text-v2:0',
-                body=json.dumps({
-                    "inputText": ticket['text'],
-                    "dimensions": 1024,
-                    "normalize": True
-                })
-            )
-            
-            embedding = json.loads(response['body'].read())['embedding']
-            
-            # Prepare vector
-            vector_entry = {
-                'key': ticket['ticket_id'],
-                'data': {'float32': embedding},
-                'metadata': {
-                    'ticket_id': ticket['ticket_id'],
-                    'summary': ticket['summary'],
-                    'priority': ticket['priority'],
-                    'status': ticket['status'],
-                    'assignee': ticket['assignee'],
-                    'marketplace_impact': ticket['business_context']['marketplace_impact'],
-                    'customer_impact': ticket['business_context']['customer_impact'],
-                    'urgency_score': str(ticket['business_context']['urgency_score']),
-                    'AMAZON_BEDROCK_TEXT': ticket['text']
-                }
-            }
-            
-            vectors.append(vector_entry)
+        units = [(ticket, unit) for ticket in enhanced_tickets for unit in vector_units(ticket, chunked)]
+        units, embeddings = embed_units(embedding_engine, units, dead_letters)
+        vectors = [
+            build_vector_entry(ticket, embedding, unit)
+            for (ticket, unit), embedding in zip(units, embeddings)
+        ]
+        
+        stats = embedding_engine.stats
+        cache_stats = embedding_engine.cache.stats
+        print(f"✅ Generated {len(embeddings)} embeddings ({stats['throughput']:.1f}/sec, {stats['throttles']} throttled calls retried)")
+        print(f"✅ Embedding cache: {cache_stats['memory_hits'] + cache_stats['disk_hits']} hits, {cache_stats['misses']} misses")
+        print_dead_letters(dead_letters)
         
         # Store vectors
-        s3vectors_client.put_vectors(
-            vectorBucketName=vector_bucket,
-            indexName='jira-tickets-enhanced',
-            vectors=vectors
+        report = VectorWriter(s3vectors_client, vector_bucket, INDEX_NAME, max_workers=S3VECTORS_WORKERS).write(vectors)
+        print_write_report(report)
+        
+        # Keep a memory-mappable local copy for the app's fallback search,
+        # holding only what the index holds
+        store_errors = unstored_keys(report)
+        stored = [i for i, (_, unit) in enumerate(units) if unit[0] not in store_errors]
+        write_embedding_store(
+            DEFAULT_STORE_PATH,
+            [units[i][1][0] for i in stored],
+            [embeddings[i] for i in stored],
+            [build_ticket_record(units[i][0]) for i in stored],
+            model_id=embedding_engine.model_id,
+            normalized=embedding_engine.normalize
         )
+        if stored:
+            print(f"✅ Wrote local embedding store: {DEFAULT_STORE_PATH}")
+        else:
+            print("⚠️ No vectors stored; local embedding store not written")
         
-        print(f"✅ Stored {len(vectors)} vectors")
+        if report['failed']:
+            print(f"❌ {report['failed']} vectors failed to store; sync watermark not saved, re-run to retry them")
+            return False
+        
+        # Record the sync watermark so later runs can be incremental
+        watermark = max_updated(tickets)
+        if watermark:
+            SyncWatermark(s3_client, s3_bucket).save(watermark, len(tickets))
+            print(f"✅ Saved sync watermark: {watermark.isoformat()}")
         
         # Step 7: Upload organizational context
         print("📚 Step 7: Adding organizational context...")
@@ -228,16 +262,7 @@ Recommended Actions:
         print("🔍 Step 8: Testing vector search...")
         
         query_text = "authentication issues"
-        query_response = bedrock_runtime.invoke_model(
-            modelId='amazon.titan-embed-text-v2:0',
-            body=json.dumps({
-                "inputText": query_text,
-                "dimensions": 1024,
-                "normalize": True
-            })
-        )
-        
-        query_embedding = json.loads(query_response['body'].read())['embedding']
+        query_embedding = embedding_engine.embed(query_text)
         
         search_results = s3vectors_client.query_vectors(
             vectorBucketName=vector_bucket,
@@ -253,52 +278,667 @@ Recommended Actions:
             print(f"  - {match.get('vectorKey', 'Unknown')}: {match.get('similarityScore', 0):.3f}")
         
         print("\n🎉 Complete Pipeline Test Successful!")
-        print(f"📊 Processed: {len(enhanced_tickets)} tickets")
+        print(f"📊 Processed: {len(enhanced_tickets)} tickets as {len(vectors)} vectors")
         print(f"🪣 S3 Bucket: {s3_bucket}")
         print(f"🔍 Vector Bucket: {vector_bucket}")
         print(f"📈 Business Context: Enhanced with LendingTree-specific insights")
         
+        print_limiter_metrics()
         return True
         
     except Exception as e:
         print(f"❌ Pipeline test failed: {str(e)}")
         return False
 
-def assess_marketplace_impact(ticket):
-    """Assess financial system impact"""
-    summary = ticket['summary'].lower()
+def run_streaming_pipeline(chunked=VECTOR_GRANULARITY == 'chunk'):
+    """Run extract → enrich → upload → chunk → embed → store as concurrent stages"""
     
-    if any(word in summary for word in ['payment', 'trading', 'fraud', 'compliance']):
-        return 'High - Critical financial system'
-    elif any(word in summary for word in ['performance', 'slow', 'timeout']):
-        return 'Medium - Performance impact'
-    else:
-        return 'Low - Standard impact'
+    print("🌊 Streaming Jira → S3 Vectors pipeline")
+    
+    s3_client = RawTicketWriter.make_client(REGION, UPLOAD_WORKERS)
+    s3vectors_client = make_s3vectors_client()
+    bedrock_runtime = make_bedrock_client()
+    embedding_engine = EmbeddingEngine(
+        bedrock_runtime,
+        max_workers=EMBEDDING_WORKERS,
+        cache=get_default_cache()
+    )
+    dead_letters = EmbeddingDeadLetterQueue(s3_client=s3_client)
+    
+    try:
+        try:
+            s3_client.create_bucket(Bucket=S3_BUCKET)
+        except:
+            pass
+        try:
+            s3vectors_client.create_vector_bucket(vectorBucketName=VECTOR_BUCKET)
+        except:
+            pass
+        try:
+            s3vectors_client.create_index(
+                vectorBucketName=VECTOR_BUCKET,
+                indexName=INDEX_NAME,
+                dimension=DEFAULT_PROFILE.dimensions,
+                distanceMetric='cosine',
+                dataType='float32'
+            )
+        except:
+            pass
+        
+        jira_client = JiraClient(
+            jira_url=os.getenv('JIRA_URL'),
+            email=os.getenv('JIRA_EMAIL'),
+            api_token=os.getenv('JIRA_API_TOKEN'),
+            max_workers=JIRA_WORKERS,
+            limiter=jira_limiter
+        )
+        
+        store_writer = EmbeddingStoreWriter(
+            DEFAULT_STORE_PATH,
+            embedding_engine.dimensions,
+            model_id=embedding_engine.model_id,
+            normalized=embedding_engine.normalize
+        )
+        watermark = {'updated': None}
+        watermark_lock = threading.Lock()
+        
+        def enrich(ticket):
+            stamp = max_updated([ticket])
+            with watermark_lock:
+                if stamp and (watermark['updated'] is None or stamp > watermark['updated']):
+                    watermark['updated'] = stamp
+            return enhance_ticket(ticket)
+        
+        raw_writer = RawTicketWriter(S3_BUCKET, s3_client, layout=RAW_TICKET_LAYOUT, max_workers=UPLOAD_WORKERS)
+        
+        def upload(batch):
+            raw_writer.write(batch)
+            return batch
+        
+        def chunk(ticket):
+            for unit in vector_units(ticket, chunked):
+                yield ticket, unit
+        
+        def embed(item):
+            ticket, unit = item
+            try:
+                return ticket, unit, embedding_engine.embed(unit[2])
+            except Exception as e:
+                # Dropped from this run; --retry-failed stores it later
+                dead_letters.put({'ticket': ticket, 'unit': list(unit)}, e)
+                return None
+        
+        vector_writer = VectorWriter(s3vectors_client, VECTOR_BUCKET, INDEX_NAME, max_workers=S3VECTORS_WORKERS)
+        write_failures = []
+        store_lock = threading.Lock()
+        
+        def store(batch):
+            report = vector_writer.write(build_vector_entry(ticket, embedding, unit) for ticket, unit, embedding in batch)
+            write_failures.extend(b for b in report['batches'] if b['status'] != 'ok')
+            # The local store only gets vectors the index accepted
+            store_errors = unstored_keys(report)
+            batch = [item for item in batch if item[1][0] not in store_errors]
+            with store_lock:
+                store_writer.append(
+                    [unit[0] for _, unit, _ in batch],
+                    [embedding for _, _, embedding in batch],
+                    [build_ticket_record(ticket) for ticket, _, _ in batch]
+                )
+            return [len(batch)]
+        
+        stats = (StreamingPipeline(jira_client.iter_recent_tickets(limit=None, days_back=90))
+                 .map('enrich', enrich)
+                 .batch('upload', upload, size=500)
+                 .flat_map('chunk', chunk)
+                 .map('embed', embed, workers=EMBEDDING_WORKERS)
+                 .batch('store', store, size=500, workers=2)
+                 .run())
+        
+        store_writer.close()
+        
+        for name, stage in stats.items():
+            if name != 'total':
+                print(f"  - {name}: {stage['items_out']} out, {stage['busy_seconds']:.1f}s busy")
+        print(f"✅ Streamed {stats['source']['items_out']} tickets as {stats['embed']['items_out']} vectors in {stats['total']['seconds']:.1f}s")
+        print_dead_letters(dead_letters)
+        if write_failures:
+            print(f"❌ {sum(b['vectors'] for b in write_failures)} vectors in {len(write_failures)} batches failed to store; "
+                  f"sync watermark not saved, re-run to retry them")
+            return False
+        
+        if watermark['updated']:
+            SyncWatermark(s3_client, S3_BUCKET).save(watermark['updated'], stats['source']['items_out'])
+            print(f"✅ Saved sync watermark: {watermark['updated'].isoformat()}")
+        
+        print_limiter_metrics()
+        return True
+        
+    except Exception as e:
+        print(f"❌ Streaming pipeline failed: {str(e)}")
+        return False
 
-def assess_customer_impact(ticket):
-    """Assess customer financial impact"""
-    summary = ticket['summary'].lower()
+def run_incremental_sync(reconcile=False, chunked=VECTOR_GRANULARITY == 'chunk'):
+    """Sync only tickets updated since the last recorded watermark"""
     
-    if any(word in summary for word in ['account', 'balance', 'transaction', 'funds']):
-        return 'High - Customer funds affected'
-    elif any(word in summary for word in ['login', 'authentication', 'access']):
-        return 'Medium - Access issues'
-    else:
-        return 'Low - Backend impact'
+    print("🔁 Incremental Jira → S3 Vectors sync")
+    
+    s3_client = RawTicketWriter.make_client(REGION, UPLOAD_WORKERS)
+    s3vectors_client = make_s3vectors_client()
+    bedrock_runtime = make_bedrock_client()
+    embedding_engine = EmbeddingEngine(
+        bedrock_runtime,
+        max_workers=EMBEDDING_WORKERS,
+        cache=get_default_cache()
+    )
+    dead_letters = EmbeddingDeadLetterQueue(s3_client=s3_client)
+    
+    try:
+        watermark_store = SyncWatermark(s3_client, S3_BUCKET)
+        since = watermark_store.load()
+        if since is None:
+            print("ℹ️  No sync watermark found - running full pipeline instead")
+            return test_complete_pipeline(chunked)
+        
+        print(f"📋 Fetching tickets updated since {since.isoformat()}...")
+        
+        jira_client = JiraClient(
+            jira_url=os.getenv('JIRA_URL'),
+            email=os.getenv('JIRA_EMAIL'),
+            api_token=os.getenv('JIRA_API_TOKEN'),
+            max_workers=JIRA_WORKERS,
+            limiter=jira_limiter
+        )
+        
+        tickets = list(jira_client.iter_updated_tickets(since))
+        print(f"✅ Found {len(tickets)} changed tickets")
+        
+        # Upsert changed tickets: put_vectors overwrites existing keys
+        enhanced_tickets = enhance_tickets(tickets)
+        RawTicketWriter(S3_BUCKET, s3_client, layout=RAW_TICKET_LAYOUT, max_workers=UPLOAD_WORKERS).write(enhanced_tickets)
+        
+        units = [(ticket, unit) for ticket in enhanced_tickets for unit in vector_units(ticket, chunked)]
+        units, embeddings = embed_units(embedding_engine, units, dead_letters)
+        vectors = [
+            build_vector_entry(ticket, embedding, unit)
+            for (ticket, unit), embedding in zip(units, embeddings)
+        ]
+        print_dead_letters(dead_letters)
+        
+        # A ticket that now has fewer chunks leaves its old trailing chunks behind
+        if chunked:
+            leftover_keys = stale_chunk_keys(s3vectors_client, units)
+        
+        report = VectorWriter(s3vectors_client, VECTOR_BUCKET, INDEX_NAME, max_workers=S3VECTORS_WORKERS).write(vectors)
+        print_write_report(report, verb="Upserted")
+        store_errors = unstored_keys(report)
+        
+        # Keep the old chunks of tickets whose new chunks did not all land
+        if chunked and store_errors:
+            unsynced = {ticket_key(key) for key in store_errors}
+            leftover_keys = [key for key in leftover_keys if ticket_key(key) not in unsynced]
+        removed_keys = []
+        if chunked and leftover_keys:
+            delete_vector_keys(s3vectors_client, leftover_keys)
+            removed_keys.extend(leftover_keys)
+            print(f"✅ Deleted {len(leftover_keys)} chunk vectors left over from longer ticket versions")
+        
+        # Jira search never returns deleted issues, so deletions need a key diff
+        if reconcile:
+            print("🧮 Reconciling index keys against Jira...")
+            jira_keys = jira_client.fetch_ticket_keys("ORDER BY created DESC")
+            index_keys = list_vector_keys(s3vectors_client)
+            # Also drop vectors of the other granularity, left over from before a switch
+            stale_keys = sorted(
+                key for key in index_keys
+                if ticket_key(key) not in jira_keys or is_chunk_key(key) != chunked
+            )
+            
+            delete_vector_keys(s3vectors_client, stale_keys)
+            removed_keys.extend(stale_keys)
+            print(f"✅ Deleted {len(stale_keys)} vectors for removed tickets")
+        
+        # Mirror the index changes in the local store the app searches
+        stored = [i for i, (_, unit) in enumerate(units) if unit[0] not in store_errors]
+        upsert_embedding_store(
+            DEFAULT_STORE_PATH,
+            [units[i][1][0] for i in stored],
+            [embeddings[i] for i in stored],
+            [build_ticket_record(units[i][0]) for i in stored],
+            drop_keys=removed_keys,
+            model_id=embedding_engine.model_id,
+            normalized=embedding_engine.normalize
+        )
+        print(f"✅ Updated local embedding store: {len(stored)} rows upserted, {len(removed_keys)} removed")
+        
+        # Leaving the watermark where it was makes the next run fetch them again
+        if report['failed']:
+            print(f"❌ {report['failed']} vectors failed to store; sync watermark not advanced, re-run to retry them")
+            return False
+        
+        new_watermark = max_updated(tickets)
+        if new_watermark and new_watermark > since:
+            watermark_store.save(new_watermark, len(tickets))
+            print(f"✅ Advanced sync watermark to {new_watermark.isoformat()}")
+        
+        print_limiter_metrics()
+        return True
+        
+    except Exception as e:
+        print(f"❌ Incremental sync failed: {str(e)}")
+        return False
 
-def calculate_urgency_score(ticket):
-    """Calculate urgency score"""
-    score = 0
+def run_retry_failed():
+    """Re-embed dead-lettered vectors and store the ones that now succeed
     
-    priority = ticket['priority'].lower()
-    if 'critical' in priority: score += 10
-    elif 'high' in priority: score += 7
-    elif 'medium' in priority: score += 4
+    Concurrency starts low and adapts: it grows while Bedrock keeps up and
+    halves when it throttles. Vectors that fail again, to embed or to
+    store, go back on the queue with their attempt count raised.
+    """
     
-    summary = ticket['summary'].lower()
-    if any(word in summary for word in ['critical', 'urgent', 'blocker']): score += 3
+    print("♻️  Retrying dead-lettered embeddings")
     
-    return min(score, 10)
+    s3_client = RawTicketWriter.make_client(REGION, UPLOAD_WORKERS)
+    s3vectors_client = make_s3vectors_client()
+    bedrock_runtime = make_bedrock_client(limited=False)
+    # No retries inside the engine, so throttling reaches the retry loop's limiter
+    embedding_engine = EmbeddingEngine(
+        bedrock_runtime,
+        max_workers=EMBEDDING_WORKERS,
+        max_retries=0,
+        cache=get_default_cache()
+    )
+    dead_letters = EmbeddingDeadLetterQueue(s3_client=s3_client)
+    vector_writer = VectorWriter(s3vectors_client, VECTOR_BUCKET, INDEX_NAME, max_workers=S3VECTORS_WORKERS)
+    
+    try:
+        counts = {'retried': 0, 'stored': 0, 'requeued': 0, 'skipped': 0}
+        for batch_id, records in dead_letters.iter_batches():
+            # Only pipeline vector units can be rebuilt here; keep anything else queued as-is
+            skipped = [record for record in records if not is_vector_unit(record.get('item'))]
+            for record in skipped:
+                dead_letters.requeue(record)
+            records = [record for record in records if is_vector_unit(record.get('item'))]
+            
+            embedded, failed = retry_dead_letters(
+                embedding_engine.embed,
+                records,
+                text=lambda item: item['unit'][2],
+                limiter=bedrock_limiter
+            )
+            
+            report = vector_writer.write(
+                build_vector_entry(record['item']['ticket'], embedding, tuple(record['item']['unit']))
+                for record, embedding in embedded
+            )
+            if embedded:
+                print_write_report(report)
+            store_errors = unstored_keys(report)
+            stored = [(record, embedding) for record, embedding in embedded if record['item']['unit'][0] not in store_errors]
+            failed.extend(
+                (record, RuntimeError(store_errors[record['item']['unit'][0]]))
+                for record, _ in embedded if record['item']['unit'][0] in store_errors
+            )
+            
+            if stored:
+                upsert_embedding_store(
+                    DEFAULT_STORE_PATH,
+                    [record['item']['unit'][0] for record, _ in stored],
+                    [embedding for _, embedding in stored],
+                    [build_ticket_record(record['item']['ticket']) for record, _ in stored],
+                    model_id=embedding_engine.model_id,
+                    normalized=embedding_engine.normalize
+                )
+            
+            for record, error in failed:
+                dead_letters.put(record['item'], error, attempts=record['attempts'])
+            # Re-queued records are durable before the batch is dropped
+            dead_letters.flush()
+            dead_letters.ack(batch_id)
+            
+            counts['retried'] += len(records)
+            counts['stored'] += len(stored)
+            counts['requeued'] += len(failed)
+            counts['skipped'] += len(skipped)
+        
+        counts['requeued'] -= dead_letters.parked
+        print(f"✅ Retried {counts['retried']} dead-lettered vectors: {counts['stored']} stored, {counts['requeued']} re-queued")
+        if dead_letters.parked:
+            print(f"☠️  {dead_letters.parked} vectors failed {dead_letters.max_attempts} times and were parked in "
+                  f"{dead_letters.poison.location}")
+        if counts['skipped']:
+            print(f"⚠️  Left {counts['skipped']} queued items that are not pipeline vectors in {dead_letters.location}")
+        print_limiter_metrics()
+        return True
+        
+    except Exception as e:
+        print(f"❌ Retry failed: {str(e)}")
+        return False
+
+def run_rescore():
+    """Recompute business context for every stored vector without re-embedding
+    
+    Rules come from financial_context.json as it is now. Tickets are scored
+    from their raw copies (full descriptions), then the index is streamed out
+    with list_vectors and only vectors whose context changed are put back,
+    with their stored vector data. The local embedding store gets its
+    metadata columns rewritten the same way.
+    """
+    
+    print("🧮 Re-scoring business context (no re-embedding)")
+    
+    s3_client = RawTicketWriter.make_client(REGION, UPLOAD_WORKERS)
+    s3vectors_client = make_s3vectors_client(max(RESCORE_SEGMENTS, S3VECTORS_WORKERS))
+    scorer = get_default_scorer()
+    
+    try:
+        # Newest raw copy of each ticket
+        latest = {}
+        for batch, _, _ in RawTicketReader(S3_BUCKET, s3_client, max_workers=UPLOAD_WORKERS).iter_batches():
+            for ticket in batch:
+                existing = latest.get(ticket['ticket_id'])
+                if existing is None or ticket.get('updated_date', '') >= existing.get('updated_date', ''):
+                    latest[ticket['ticket_id']] = ticket
+        
+        contexts = dict(zip(latest, scorer.score_many(latest.values())))
+        print(f"✅ Scored {len(contexts)} tickets with rules {scorer.version}")
+        
+        counts = {'scanned': 0, 'changed': 0}
+        
+        def changed_vectors():
+            for vector in iter_index_vectors(s3vectors_client, RESCORE_SEGMENTS):
+                counts['scanned'] += 1
+                metadata = vector.get('metadata', {})
+                context = rescored_context(metadata.get('ticket_id') or ticket_key(vector['key']), metadata, contexts, scorer)
+                updated = dict(metadata, **{field: context[field] for field in CONTEXT_FIELDS})
+                if updated != metadata:
+                    counts['changed'] += 1
+                    yield {'key': vector['key'], 'data': vector['data'], 'metadata': updated}
+        
+        report = VectorWriter(s3vectors_client, VECTOR_BUCKET, INDEX_NAME, max_workers=S3VECTORS_WORKERS).write(changed_vectors())
+        print_write_report(report, verb="Re-put")
+        print(f"✅ {counts['changed']} of {counts['scanned']} vectors had changed business context")
+        
+        store = EmbeddingStore.open(DEFAULT_STORE_PATH)
+        if store is not None:
+            records = []
+            for row in store.metadata:
+                context = rescored_context(row.get('id', ''), row, contexts, scorer)
+                records.append(dict(row, **{field: context[field] for field in CONTEXT_FIELDS}))
+            update_store_metadata(store.path, records)
+            print(f"✅ Rewrote local embedding store metadata for {len(records)} rows")
+        
+        print_limiter_metrics()
+        return True
+        
+    except Exception as e:
+        print(f"❌ Re-score failed: {str(e)}")
+        return False
+
+def rescored_context(ticket_id, metadata, contexts, scorer):
+    """Context for a stored vector: its ticket's, else scored from the vector's own text"""
+    context = contexts.get(ticket_id)
+    if context is None:
+        context = scorer.score({
+            'summary': metadata.get('summary', ''),
+            'description': metadata.get('AMAZON_BEDROCK_TEXT') or metadata.get('text', ''),
+            'priority': metadata.get('priority', '')
+        })
+        contexts[ticket_id] = context
+    return context
+
+def iter_index_vectors(s3vectors_client, segments=1):
+    """Stream every vector in the index with its data and metadata.
+    
+    The key space is split into list_vectors segments that are paged in
+    parallel, one request in flight per segment.
+    """
+    def page(segment, token=None):
+        params = {
+            'vectorBucketName': VECTOR_BUCKET,
+            'indexName': INDEX_NAME,
+            'returnData': True,
+            'returnMetadata': True,
+            'segmentCount': segments,
+            'segmentIndex': segment
+        }
+        if token:
+            params['nextToken'] = token
+        return segment, s3vectors_client.list_vectors(**params)
+    
+    with ThreadPoolExecutor(max_workers=segments) as executor:
+        pending = {executor.submit(page, segment) for segment in range(segments)}
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                segment, response = future.result()
+                if response.get('nextToken'):
+                    pending.add(executor.submit(page, segment, response['nextToken']))
+                yield from response.get('vectors', [])
+
+def enhance_tickets(tickets):
+    """Enhance a batch of raw Jira tickets, scoring them in one pass"""
+    contexts = get_default_scorer().score_many(tickets)
+    return [enhance_ticket(ticket, context) for ticket, context in zip(tickets, contexts)]
+
+def enhance_ticket(ticket, business_context=None):
+    """Add business context to a raw Jira ticket"""
+    return {
+        'ticket_id': ticket['key'],
+        'summary': ticket['summary'],
+        'description': ticket.get('description', ''),
+        'priority': ticket['priority'],
+        'status': ticket['status'],
+        'assignee': ticket['assignee'],
+        'components': ticket.get('components', []),
+        'created_date': ticket['created'],
+        'updated_date': ticket.get('updated', ''),
+        # Plain text, not the ADF dict's repr, so embeddings see only content
+        'text': f"{ticket['summary']}\n{description_text(ticket)}",
+        'business_context': business_context or get_default_scorer().score(ticket)
+    }
+
+def vector_units(ticket, chunked=False):
+    """(vector key, chunk type, text, vectors for the ticket) for each vector
+    an enhanced ticket is stored as"""
+    if not chunked:
+        return [(ticket['ticket_id'], 'ticket', ticket['text'], 1)]
+    
+    chunks = chunker.chunk_ticket({
+        'key': ticket['ticket_id'],
+        'summary': ticket['summary'],
+        'description': ticket['description'],
+        'status': ticket['status'],
+        'priority': ticket['priority'],
+        'assignee': ticket['assignee'],
+        'component': ', '.join(ticket.get('components', [])),
+        'created': ticket['created_date'],
+        'updated': ticket['updated_date']
+    })
+    return [(chunk.chunk_id, chunk.chunk_type, chunk.text, len(chunks)) for chunk in chunks]
+
+def build_vector_entry(ticket, embedding, unit=None):
+    """Build a put_vectors entry for an enhanced ticket, or one of its chunks"""
+    key, chunk_type, text, chunk_count = unit or (ticket['ticket_id'], 'ticket', ticket['text'], 1)
+    return {
+        'key': key,
+        'data': {'float32': embedding},
+        'metadata': {
+            'ticket_id': ticket['ticket_id'],
+            'summary': ticket['summary'],
+            'priority': ticket['priority'],
+            'status': ticket['status'],
+            'assignee': ticket['assignee'],
+            'component': ticket.get('components', []),
+            'marketplace_impact': ticket['business_context']['marketplace_impact'],
+            'customer_impact': ticket['business_context']['customer_impact'],
+            # Numeric so metadataFilters can apply range conditions
+            'urgency_score': ticket['business_context']['urgency_score'],
+            'created_at': created_at(ticket['created_date']),
+            'chunk_type': chunk_type,
+            # Lets a later sync find chunks a shorter revision no longer has
+            'chunk_count': chunk_count,
+            'AMAZON_BEDROCK_TEXT': text
+        }
+    }
+
+def created_at(created_date):
+    """Epoch seconds of a Jira created stamp (0 if unparseable)"""
+    try:
+        stamp = parse_jira_timestamp(created_date)
+    except ValueError:
+        return 0
+    return int(stamp.timestamp()) if stamp else 0
+
+def build_ticket_record(ticket):
+    """Flat ticket record in the shape the Streamlit app displays"""
+    return {
+        'id': ticket['ticket_id'],
+        'text': ticket['text'],
+        'summary': ticket['summary'],
+        'priority': ticket['priority'],
+        'status': ticket['status'],
+        'assignee': ticket['assignee'],
+        'component': ', '.join(ticket.get('components', [])),
+        'marketplace_impact': ticket['business_context']['marketplace_impact'],
+        'customer_impact': ticket['business_context']['customer_impact'],
+        'urgency_score': ticket['business_context']['urgency_score'],
+        'created': ticket['created_date'],
+        # Lets readers tell a current row from one an edit has superseded
+        'updated': ticket['updated_date']
+    }
+
+def make_bedrock_client(limited=True):
+    """bedrock-runtime client, with calls paced by the shared adaptive limiter"""
+    client = boto3.client(
+        'bedrock-runtime',
+        region_name=REGION,
+        config=Config(max_pool_connections=EMBEDDING_WORKERS)
+    )
+    return LimitedClient(client, bedrock_limiter) if limited else client
+
+def make_s3vectors_client(pool_size=S3VECTORS_WORKERS):
+    """s3vectors client, with calls paced by the shared adaptive limiter"""
+    client = boto3.client('s3vectors', region_name=REGION, config=Config(max_pool_connections=pool_size))
+    return LimitedClient(client, s3vectors_limiter)
+
+def print_limiter_metrics():
+    """Where each service's adaptive concurrency settled"""
+    for limiter in (jira_limiter, bedrock_limiter, s3vectors_limiter):
+        metrics = limiter.metrics
+        if metrics['calls']:
+            print(f"🚦 {metrics['name']}: {metrics['limit']} concurrent calls, "
+                  f"{metrics['throttles']} of {metrics['calls']} throttled "
+                  f"({metrics['throttle_rate']:.1%} over the last minute)")
+
+def unstored_keys(report):
+    """{vector key: error} for every vector in a VectorWriter report's failed batches"""
+    return {
+        key: batch['error']
+        for batch in report['batches'] if batch['status'] != 'ok'
+        for key in batch['keys']
+    }
+
+def print_write_report(report, verb="Stored"):
+    """Summarize a VectorWriter report"""
+    print(f"✅ {verb} {report['stored']} vectors in {len(report['batches'])} batches ({report['seconds']:.1f}s)")
+    for batch in report['batches']:
+        if batch['status'] != 'ok':
+            print(f"❌ Batch {batch['batch']}: {batch['vectors']} vectors failed after {batch['attempts']} attempts: {batch['error']}")
+
+def embed_units(embedding_engine, units, dead_letters):
+    """Embed (ticket, unit) pairs, returning only those that succeeded
+    
+    A failed unit goes to the dead-letter queue rather than being stored
+    with a placeholder vector. Returns ``(units, embeddings)``.
+    """
+    def failed(position, error):
+        ticket, unit = units[position]
+        dead_letters.put({'ticket': ticket, 'unit': list(unit)}, error)
+    
+    embeddings = embedding_engine.embed_many((unit[2] for _, unit in units), on_error=failed)
+    kept = [i for i, embedding in enumerate(embeddings) if embedding is not None]
+    return [units[i] for i in kept], [embeddings[i] for i in kept]
+
+def is_vector_unit(item):
+    """Whether a dead-lettered item is a (ticket, unit) pair queued by this pipeline"""
+    return isinstance(item, dict) and isinstance(item.get('ticket'), dict) and isinstance(item.get('unit'), list)
+
+def print_dead_letters(dead_letters):
+    """Report embeddings dead-lettered by this run"""
+    dead_letters.flush()
+    if dead_letters.added:
+        print(f"⚠️  {dead_letters.added} embeddings failed and were dead-lettered to {dead_letters.location} "
+              f"(run with --retry-failed to store them)")
+
+def stale_chunk_keys(s3vectors_client, units):
+    """Chunk keys of re-chunked tickets that their new revision no longer writes"""
+    new_counts = {ticket['ticket_id']: unit[3] for ticket, unit in units}
+    title_keys = [f"{ticket_id}_title" for ticket_id in new_counts]
+    stale = []
+    
+    for i in range(0, len(title_keys), 100):
+        response = s3vectors_client.get_vectors(
+            vectorBucketName=VECTOR_BUCKET,
+            indexName=INDEX_NAME,
+            keys=title_keys[i:i+100],
+            returnMetadata=True
+        )
+        for vector in response.get('vectors', []):
+            ticket_id = ticket_key(vector['key'])
+            old_count = int(vector.get('metadata', {}).get('chunk_count', 0))
+            # Counts include the title chunk; description chunks are numbered from 0
+            stale.extend(f"{ticket_id}_desc_{n}" for n in range(new_counts[ticket_id] - 1, old_count - 1))
+    
+    return stale
+
+def delete_vector_keys(s3vectors_client, keys):
+    """Delete vectors by key in batches of 500"""
+    for i in range(0, len(keys), 500):
+        s3vectors_client.delete_vectors(
+            vectorBucketName=VECTOR_BUCKET,
+            indexName=INDEX_NAME,
+            keys=keys[i:i+500]
+        )
+
+def list_vector_keys(s3vectors_client):
+    """Return every vector key currently in the index"""
+    keys = set()
+    params = {'vectorBucketName': VECTOR_BUCKET, 'indexName': INDEX_NAME}
+    
+    while True:
+        response = s3vectors_client.list_vectors(**params)
+        keys.update(v['key'] for v in response.get('vectors', []))
+        
+        if not response.get('nextToken'):
+            return keys
+        params['nextToken'] = response['nextToken']
 
 if __name__ == "__main__":
-    test_complete_pipeline()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Jira → S3 Vectors pipeline")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only sync tickets updated since the last run")
+    parser.add_argument('--streaming', action='store_true',
+                        help="run the full load as concurrent streaming stages")
+    parser.add_argument('--reconcile', action='store_true',
+                        help="with --incremental, delete vectors for tickets removed from Jira")
+    parser.add_argument('--rescore', action='store_true',
+                        help="recompute business context metadata for stored vectors without re-embedding")
+    parser.add_argument('--retry-failed', action='store_true',
+                        help="re-embed and store vectors whose embedding failed in earlier runs")
+    parser.add_argument('--chunks', action='store_true',
+                        help="store title and description chunk vectors instead of one vector per ticket")
+    args = parser.parse_args()
+    chunked = args.chunks or VECTOR_GRANULARITY == 'chunk'
+    
+    if args.retry_failed:
+        run_retry_failed()
+    elif args.rescore:
+        run_rescore()
+    elif args.incremental:
+        run_incremental_sync(reconcile=args.reconcile, chunked=chunked)
+    elif args.streaming:
+        run_streaming_pipeline(chunked=chunked)
+    else:
+        test_complete_pipeline(chunked)
\ No newline at end of file
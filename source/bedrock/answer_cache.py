@@ -0,0 +1,131 @@
+import hashlib
+import re
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+
+class AnswerCache:
+    """In-memory cache of generated answers for repeated questions.
+
+    An entry is keyed by the normalized question plus a fingerprint of the
+    retrieved tickets (IDs and ``updated`` stamps), so the same question over
+    changed tickets misses. Within one fingerprint, a differently phrased
+    question still hits when its embedding's cosine similarity to a cached
+    question reaches ``similarity_threshold``. Entries expire after
+    ``ttl_seconds``, the least recently used are evicted beyond
+    ``max_entries``, and ``invalidate`` drops everything when the index
+    version changes.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600.0, similarity_threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'exact_hits': 0, 'similar_hits': 0, 'misses': 0, 'writes': 0, 'invalidations': 0}
+
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        """Lowercase, drop punctuation and collapse whitespace"""
+        return ' '.join(re.sub(r'[^\w\s]', ' ', question.lower()).split())
+
+    @staticmethod
+    def fingerprint(tickets: List[Dict[str, Any]]) -> str:
+        """Order-independent hash of ticket IDs and their updated stamps.
+
+        Pass full ticket records: without ``updated`` an edit to a ticket
+        would not change the fingerprint.
+        """
+        pairs = sorted(f"{t.get('id', '')}@{t.get('updated', '')}" for t in tickets)
+        return hashlib.sha1('\n'.join(pairs).encode('utf-8')).hexdigest()
+
+    def get(self, question: str, fingerprint: str, query_embedding: List[float] = None) -> Optional[Dict[str, Any]]:
+        """Return ``{'answer', 'question', 'age_seconds', 'similarity'}`` or None"""
+        key = (self.normalize_question(question), fingerprint)
+        now = time.time()
+
+        with self._lock:
+            self._expire(now)
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats['exact_hits'] += 1
+                return self._hit(entry, now, 1.0)
+
+            if query_embedding is not None:
+                query = self._unit(query_embedding)
+                best_key, best_score = None, self.similarity_threshold
+                for candidate_key, candidate in self._entries.items():
+                    if candidate_key[1] != fingerprint or candidate['embedding'] is None:
+                        continue
+                    score = float(np.dot(query, candidate['embedding']))
+                    if score >= best_score:
+                        best_key, best_score = candidate_key, score
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self._stats['similar_hits'] += 1
+                    return self._hit(self._entries[best_key], now, best_score)
+
+            self._stats['misses'] += 1
+            return None
+
+    def put(self, question: str, fingerprint: str, answer: str, query_embedding: List[float] = None):
+        """Cache a generated answer"""
+        key = (self.normalize_question(question), fingerprint)
+        with self._lock:
+            self._entries[key] = {
+                'answer': answer,
+                'question': question,
+                'embedding': self._unit(query_embedding) if query_embedding is not None else None,
+                'created': time.time()
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._stats['writes'] += 1
+
+    def invalidate(self, version: str = None):
+        """Drop all entries when the index version changes (always if None)"""
+        with self._lock:
+            if version is not None and version == self.version:
+                return
+            self._entries.clear()
+            self.version = version
+            self._stats['invalidations'] += 1
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and the combined hit rate"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        hits = stats['exact_hits'] + stats['similar_hits']
+        lookups = hits + stats['misses']
+        stats['hit_rate'] = hits / lookups if lookups else 0.0
+        return stats
+
+    def _expire(self, now: float):
+        # Entries are in LRU order, not age order, so scan them all
+        expired = [key for key, entry in self._entries.items() if now - entry['created'] > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+
+    @staticmethod
+    def _hit(entry: Dict[str, Any], now: float, similarity: float) -> Dict[str, Any]:
+        return {
+            'answer': entry['answer'],
+            'question': entry['question'],
+            'age_seconds': now - entry['created'],
+            'similarity': similarity
+        }
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
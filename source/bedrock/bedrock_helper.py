@@ -1,41 +1,61 @@
 import boto3
-import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+from source.bedrock.claude_stream import DEFAULT_TEXT_MODEL, stream_claude
+from source.bedrock.embedding_cache import get_default_cache
+from source.bedrock.embedding_engine import EmbeddingEngine
+from source.bedrock.embedding_profile import DEFAULT_PROFILE
 
 class BedrockHelper:
-    def __init__(self, region='us-east-1'):
+    def __init__(self, region='us-east-1', profile=None, dead_letters=None):
         self.bedrock_client = boto3.client('bedrock-runtime', region_name=region)
-        self.embedding_model = 'amazon.titan-embed-text-v1'
-        self.text_model = 'anthropic.claude-3-sonnet-20240229-v1:0'
+        self.profile = profile or DEFAULT_PROFILE
+        self.embedding_model = self.profile.model_id
+        self.text_model = DEFAULT_TEXT_MODEL
+        self.embedding_engine = EmbeddingEngine(
+            self.bedrock_client,
+            profile=self.profile,
+            max_workers=10,
+            cache=get_default_cache()
+        )
+        # Optional EmbeddingDeadLetterQueue for texts that fail to embed. Give it
+        # a location of its own: the pipeline's --retry-failed only handles its units
+        self.dead_letters = dead_letters
     
-    def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for text using Amazon Titan"""
+    def generate_embedding(self, text: str) -> Optional[List[float]]:
+        """Generate embedding for text using Amazon Titan (None if it fails)"""
         try:
             # Clean and prepare text
             clean_text = text.replace('\n', ' ').strip()
             if not clean_text:
                 clean_text = "empty"
             
-            body = json.dumps({
-                "inputText": clean_text
-            })
-            
-            response = self.bedrock_client.invoke_model(
-                modelId=self.embedding_model,
-                body=body,
-                contentType='application/json'
-            )
-            
-            response_body = json.loads(response['body'].read())
-            return response_body['embedding']
+            # Cache hits return without calling Bedrock
+            return self.embedding_engine.embed(clean_text)
             
         except Exception as e:
             print(f"Error generating embedding: {str(e)}")
-            # Return zero vector as fallback
-            return [0.0] * 1536  # Titan embedding dimension
+            # A zero vector would be stored and searched as if it were real
+            if self.dead_letters is not None:
+                self.dead_letters.put({'text': text}, e)
+            return None
+    
+    def generate_embeddings(self, texts: Iterable[str]) -> List[Optional[List[float]]]:
+        """Generate embeddings for many texts concurrently, in input order (None where one fails)"""
+        texts = [text.replace('\n', ' ').strip() for text in texts]
+
+        def failed(position, error):
+            print(f"Error generating embedding: {str(error)}")
+            if self.dead_letters is not None:
+                self.dead_letters.put({'text': texts[position]}, error)
+
+        return self.embedding_engine.embed_many(texts, on_error=failed)
     
     def generate_response(self, query: str, context: str) -> str:
         """Generate response using Claude with retrieved context"""
+        return "".join(self.stream_response(query, context))
+    
+    def stream_response(self, query: str, context: str) -> Iterator[str]:
+        """Stream a Claude response with retrieved context, yielding text deltas"""
         try:
             prompt = f"""You are a helpful Jira assistant. Based on the following Jira tickets context, answer the user's question.
 
@@ -46,31 +66,17 @@ User Question: {query}
 
 Please provide a helpful response based on the Jira tickets shown above. If the context doesn't contain relevant information, say so clearly."""
 
-            body = json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 1000,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            })
-            
-            response = self.bedrock_client.invoke_model(
-                modelId=self.text_model,
-                body=body,
-                contentType='application/json'
-            )
-            
-            response_body = json.loads(response['body'].read())
-            return response_body['content'][0]['text']
+            yield from stream_claude(self.bedrock_client, prompt, model_id=self.text_model, max_tokens=1000)
             
         except Exception as e:
-            return f"Error generating response: {str(e)}"
+            yield f"Error generating response: {str(e)}"
     
     def analyze_tickets(self, tickets: List[Dict[str, Any]]) -> str:
         """Analyze a collection of tickets for insights"""
+        return "".join(self.stream_analysis(tickets))
+    
+    def stream_analysis(self, tickets: List[Dict[str, Any]]) -> Iterator[str]:
+        """Stream an analysis of a collection of tickets, yielding text deltas"""
         try:
             # Prepare ticket summaries
             ticket_summaries = []
@@ -93,25 +99,7 @@ Please provide:
 
 Keep the analysis concise and actionable."""
 
-            body = json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 800,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            })
-            
-            response = self.bedrock_client.invoke_model(
-                modelId=self.text_model,
-                body=body,
-                contentType='application/json'
-            )
-            
-            response_body = json.loads(response['body'].read())
-            return response_body['content'][0]['text']
+            yield from stream_claude(self.bedrock_client, prompt, model_id=self.text_model, max_tokens=800)
             
         except Exception as e:
-            return f"Error analyzing tickets: {str(e)}"
\ No newline at end of file
+            yield f"Error analyzing tickets: {str(e)}"
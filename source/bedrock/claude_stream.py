@@ -0,0 +1,54 @@
+import json
+import time
+from typing import Iterator, Dict, Any
+
+DEFAULT_TEXT_MODEL = 'anthropic.claude-3-sonnet-20240229-v1:0'
+
+def claude_request_body(prompt: str, max_tokens: int = 1000) -> str:
+    """Anthropic Messages request body for a single user prompt"""
+    return json.dumps({
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": max_tokens,
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    })
+
+def stream_claude(bedrock_client, prompt: str, model_id: str = DEFAULT_TEXT_MODEL, max_tokens: int = 1000,
+                  stats: Dict[str, Any] = None) -> Iterator[str]:
+    """Yield text deltas from Claude as they are generated.
+
+    Uses ``invoke_model_with_response_stream`` so the first words reach the
+    caller after time-to-first-token rather than after the full completion.
+    If ``stats`` is given it is filled with ``first_token_seconds``,
+    ``total_seconds``, ``input_tokens`` and ``output_tokens``.
+    """
+    started = time.time()
+    response = bedrock_client.invoke_model_with_response_stream(
+        modelId=model_id,
+        body=claude_request_body(prompt, max_tokens),
+        contentType='application/json',
+        accept='application/json'
+    )
+
+    for event in response['body']:
+        if 'chunk' not in event:
+            # Mid-stream failures arrive as events, e.g. modelStreamErrorException
+            error_type, error = next(iter(event.items()))
+            raise RuntimeError(f"{error_type}: {error.get('message', error)}")
+
+        data = json.loads(event['chunk']['bytes'])
+        if data['type'] == 'content_block_delta' and data['delta'].get('type') == 'text_delta':
+            if stats is not None and 'first_token_seconds' not in stats:
+                stats['first_token_seconds'] = time.time() - started
+            yield data['delta']['text']
+        elif stats is not None and data['type'] == 'message_start':
+            stats['input_tokens'] = data['message'].get('usage', {}).get('input_tokens', 0)
+        elif stats is not None and data['type'] == 'message_delta':
+            stats['output_tokens'] = data.get('usage', {}).get('output_tokens', 0)
+
+    if stats is not None:
+        stats['total_seconds'] = time.time() - started
@@ -0,0 +1,101 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+DEFAULT_CACHE_PATH = os.getenv('EMBEDDING_CACHE_PATH', '.cache/embeddings.sqlite')
+
+class EmbeddingCache:
+    """Two-tier content-hash cache for embeddings.
+
+    Entries are keyed by (model id, dimensions, normalize flag, SHA-256 of the
+    text). A bounded in-memory LRU sits in front of a SQLite file, so repeat
+    texts skip Bedrock both within a process and across runs. Pass
+    ``path=None`` for a memory-only cache.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, max_memory_entries: int = 50000):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0}
+        self._db = None
+
+        if path:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            # WAL lets the pipeline write while the Streamlit app reads
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.execute('CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)')
+            self._db.commit()
+
+    @staticmethod
+    def make_key(model_id: str, dimensions: int, normalize: bool, text: str) -> str:
+        """Build the cache key for one embedding request"""
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{model_id}|{dimensions}|{int(bool(normalize))}|{digest}"
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Return a cached embedding, or None on a miss"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute('SELECT vector FROM embeddings WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    embedding = array('f', row[0]).tolist()
+                    self._remember(key, embedding)
+                    self._stats['disk_hits'] += 1
+                    return embedding
+
+            self._stats['misses'] += 1
+            return None
+
+    def put(self, key: str, embedding: List[float]):
+        """Store an embedding in both tiers"""
+        with self._lock:
+            self._remember(key, embedding)
+            if self._db is not None:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)',
+                    (key, array('f', embedding).tobytes())
+                )
+                self._db.commit()
+            self._stats['writes'] += 1
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and the combined hit rate"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+        hits = stats['memory_hits'] + stats['disk_hits']
+        lookups = hits + stats['misses']
+        stats['hit_rate'] = hits / lookups if lookups else 0.0
+        return stats
+
+    def _remember(self, key: str, embedding: List[float]):
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_default_cache() -> EmbeddingCache:
+    """Process-wide cache shared by BedrockHelper, the pipeline and the app"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = EmbeddingCache()
+        return _default_cache
@@ -0,0 +1,209 @@
+import boto3
+import glob
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from source.utils.adaptive_limiter import AIMDLimiter
+
+# Local JSONL file, or s3://bucket/prefix
+DEFAULT_DLQ_LOCATION = os.getenv('EMBEDDING_DLQ', '.cache/embedding_dlq.jsonl')
+# Failures after which an item is parked in the poison queue instead of retried
+DEFAULT_MAX_ATTEMPTS = int(os.getenv('EMBEDDING_DLQ_MAX_ATTEMPTS', '5'))
+
+class EmbeddingDeadLetterQueue:
+    """Durable queue of texts whose embedding failed.
+
+    Failed items are recorded instead of being stored as zero vectors, and a
+    retry worker drains them later. ``location`` is a local JSONL path or
+    ``s3://bucket/prefix``. Records are buffered and written in batches:
+    appended to the file locally, or written as one JSONL object per flush
+    on S3.
+
+    ``iter_batches`` hands out ``(batch_id, records)`` and ``ack(batch_id)``
+    deletes a batch once handled. A local file is renamed before it is read,
+    so failures recorded during a drain go to a fresh file.
+
+    An item that has failed ``max_attempts`` times is parked in ``poison``,
+    a queue beside this one (``<name>.poison.jsonl`` or ``<prefix>-poison/``)
+    that nothing retries automatically. Each producer should use its own
+    location so a retry worker only sees items it knows how to handle.
+    """
+
+    def __init__(self, location: str = DEFAULT_DLQ_LOCATION, s3_client=None, flush_size: int = 500,
+                 max_attempts: Optional[int] = DEFAULT_MAX_ATTEMPTS):
+        self.location = location
+        self.flush_size = flush_size
+        self.max_attempts = max_attempts
+        self.added = 0
+        self.parked = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+
+        if location.startswith('s3://'):
+            self.bucket, _, prefix = location[len('s3://'):].partition('/')
+            self.prefix = prefix.rstrip('/') + '/' if prefix else 'dlq/embeddings/'
+            self.s3_client = s3_client or boto3.client('s3')
+            poison_location = f"s3://{self.bucket}/{self.prefix.rstrip('/')}-poison/"
+        else:
+            self.bucket = None
+            self.path = location
+            root, extension = os.path.splitext(location)
+            poison_location = f"{root}.poison{extension or '.jsonl'}"
+
+        self.poison = (
+            EmbeddingDeadLetterQueue(poison_location, s3_client, flush_size, max_attempts=None)
+            if max_attempts is not None else None
+        )
+
+    def put(self, item: Any, error: Exception, attempts: int = 0):
+        """Record a failed item (anything JSON-serializable) with its error.
+
+        ``attempts`` is how often the item had already failed, for items
+        re-queued by a retry.
+        """
+        record = {
+            'item': item,
+            'error': f"{type(error).__name__}: {error}",
+            'attempts': attempts + 1,
+            'failed_at': datetime.now(timezone.utc).isoformat()
+        }
+        if self.poison is not None and record['attempts'] >= self.max_attempts:
+            with self._lock:
+                self.parked += 1
+            self.poison.requeue(record)
+            return
+        with self._lock:
+            self.added += 1
+        self.requeue(record)
+
+    def requeue(self, record: Dict[str, Any]):
+        """Put back a record from iter_batches unchanged"""
+        with self._lock:
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.flush_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write buffered records (and parked ones)"""
+        if self.poison is not None:
+            self.poison.flush()
+        with self._lock:
+            records, self._buffer = self._buffer, []
+            if not records:
+                return
+            body = ''.join(json.dumps(record) + '\n' for record in records)
+
+            if self.bucket:
+                key = f"{self.prefix}{datetime.now(timezone.utc).strftime('%Y/%m/%d')}/{uuid.uuid4().hex}.jsonl"
+                self.s3_client.put_object(Bucket=self.bucket, Key=key, Body=body.encode('utf-8'),
+                                          ContentType='application/x-ndjson')
+            else:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with open(self.path, 'a') as f:
+                    f.write(body)
+
+    def iter_batches(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """Yield (batch_id, records) for everything queued when the drain starts.
+
+        The batches are listed up front, so records re-queued while draining
+        wait for the next drain instead of being retried again in this one.
+        """
+        self.flush()
+        if self.bucket:
+            batch_ids = []
+            params = {'Bucket': self.bucket, 'Prefix': self.prefix}
+            while True:
+                response = self.s3_client.list_objects_v2(**params)
+                batch_ids.extend(obj['Key'] for obj in response.get('Contents', []))
+                if not response.get('IsTruncated'):
+                    break
+                params['ContinuationToken'] = response['NextContinuationToken']
+            for key in batch_ids:
+                body = self.s3_client.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+                yield key, _parse_lines(body.decode('utf-8'))
+        else:
+            if os.path.exists(self.path):
+                draining = f"{self.path}.{int(time.time() * 1000)}.draining"
+                with self._lock:
+                    os.replace(self.path, draining)
+            # Batches left by an interrupted drain come first (names sort by time)
+            for path in sorted(glob.glob(f"{self.path}.*.draining")):
+                with open(path, 'r') as f:
+                    yield path, _parse_lines(f.read())
+
+    def ack(self, batch_id: str):
+        """Delete a batch returned by iter_batches"""
+        if self.bucket:
+            self.s3_client.delete_object(Bucket=self.bucket, Key=batch_id)
+        elif os.path.exists(batch_id):
+            os.remove(batch_id)
+
+    def pending(self) -> int:
+        """Records queued and not yet acknowledged"""
+        self.flush()
+        if self.bucket:
+            count = 0
+            params = {'Bucket': self.bucket, 'Prefix': self.prefix}
+            while True:
+                response = self.s3_client.list_objects_v2(**params)
+                for obj in response.get('Contents', []):
+                    body = self.s3_client.get_object(Bucket=self.bucket, Key=obj['Key'])['Body'].read()
+                    count += len(_parse_lines(body.decode('utf-8')))
+                if not response.get('IsTruncated'):
+                    return count
+                params['ContinuationToken'] = response['NextContinuationToken']
+
+        count = 0
+        for path in glob.glob(f"{self.path}.*.draining") + ([self.path] if os.path.exists(self.path) else []):
+            with open(path, 'r') as f:
+                count += sum(1 for line in f if line.strip())
+        return count
+
+def _parse_lines(text: str) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def retry_dead_letters(embed: Callable[[str], List[float]], records: List[Dict[str, Any]],
+                       text: Callable[[Any], str], limiter: AIMDLimiter = None,
+                       max_throttles: int = 8, backoff_seconds: float = 1.0
+                       ) -> Tuple[List[Tuple[Dict[str, Any], List[float]]], List[Tuple[Dict[str, Any], Exception]]]:
+    """Re-embed dead-lettered records with adaptive concurrency.
+
+    Every attempt goes through ``limiter``, which starts at a couple of
+    calls in flight, adds more while Bedrock keeps up and halves them when
+    it throttles. A throttled record waits with jittered backoff and tries
+    again, up to ``max_throttles`` times. ``embed`` should not retry
+    throttling itself (e.g. an EmbeddingEngine with ``max_retries=0``) so
+    the signal reaches the limiter. ``text`` extracts the text from a
+    record's item.
+
+    Returns ``(embedded, failed)``: ``(record, embedding)`` and
+    ``(record, error)`` pairs.
+    """
+    limiter = limiter or AIMDLimiter('bedrock-runtime', initial_limit=2, max_limit=16)
+
+    def attempt(record):
+        for throttles in range(max_throttles):
+            try:
+                return record, limiter.call(embed, text(record['item'])), None
+            except Exception as e:
+                if not limiter.is_throttle(e) or throttles == max_throttles - 1:
+                    return record, None, e
+                time.sleep(random.uniform(0, backoff_seconds * 2 ** throttles))
+
+    embedded, failed = [], []
+    # Pool sized for the ceiling; the limiter decides how many actually run
+    with ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
+        for record, embedding, error in executor.map(attempt, records):
+            if error is None:
+                embedded.append((record, embedding))
+            else:
+                failed.append((record, error))
+
+    return embedded, failed
@@ -0,0 +1,147 @@
+import boto3
+import json
+import random
+import threading
+import time
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from source.bedrock.embedding_profile import DEFAULT_PROFILE, EmbeddingProfile
+
+# Error codes Bedrock (and S3 Vectors) return when we exceed the account's quota
+THROTTLING_ERROR_CODES = {
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceUnavailableException',
+    'ModelNotReadyException',
+    'SlowDown'
+}
+
+def is_throttling_error(error: Exception) -> bool:
+    """True if a boto3 error means "slow down" rather than "bad request" """
+    if isinstance(error, ClientError):
+        return error.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
+    return False
+
+class EmbeddingEngine:
+    """Concurrent Titan embedding client.
+
+    Fans ``invoke_model`` calls out over a bounded thread pool, returns
+    embeddings in input order and retries throttled calls with full-jitter
+    exponential backoff. With an ``EmbeddingCache`` attached, cache hits
+    skip Bedrock entirely. Model, dimensions and normalization come from an
+    ``EmbeddingProfile`` (the environment's by default).
+    """
+
+    def __init__(self, bedrock_client=None, region='us-east-1',
+                 profile: EmbeddingProfile = None, max_workers=16, max_retries=6,
+                 base_delay=0.5, max_delay=20.0, cache=None):
+        if bedrock_client is None:
+            # One pooled connection per worker thread
+            bedrock_client = boto3.client(
+                'bedrock-runtime',
+                region_name=region,
+                config=Config(max_pool_connections=max_workers)
+            )
+        self.bedrock_client = bedrock_client
+        self.profile = profile or DEFAULT_PROFILE
+        self.model_id = self.profile.model_id
+        self.dimensions = self.profile.dimensions
+        self.normalize = self.profile.normalize
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.cache = cache
+
+        self._lock = threading.Lock()
+        self._stats = {'texts': 0, 'calls': 0, 'retries': 0, 'throttles': 0, 'failures': 0, 'seconds': 0.0}
+
+    def embed(self, text: str) -> List[float]:
+        """Embed a single text, retrying on throttling"""
+        request = self.profile.request_body(text)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(self.model_id, self.dimensions, self.normalize, request['inputText'])
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        body = json.dumps(request)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._count(calls=1)
+                response = self.bedrock_client.invoke_model(
+                    modelId=self.model_id,
+                    body=body,
+                    contentType='application/json'
+                )
+                embedding = json.loads(response['body'].read())['embedding']
+                if cache_key is not None:
+                    self.cache.put(cache_key, embedding)
+                return embedding
+
+            except Exception as e:
+                if not is_throttling_error(e) or attempt == self.max_retries:
+                    raise
+                self._count(retries=1, throttles=1)
+                time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+
+    def iter_embeddings(self, texts: Iterable[str],
+                        on_error: Callable[[int, Exception], None] = None) -> Iterator[Optional[List[float]]]:
+        """Yield embeddings in input order while keeping a bounded window in flight.
+
+        Without ``on_error`` a failed text raises. With it, the callback gets
+        the text's position and the error, and ``None`` is yielded in its place.
+        """
+        started = time.time()
+        window = deque()
+        count = 0
+
+        def result(future):
+            try:
+                return future.result()
+            except Exception as e:
+                if on_error is None:
+                    raise
+                self._count(failures=1)
+                on_error(count - 1, e)
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                for text in texts:
+                    window.append(executor.submit(self.embed, text))
+                    if len(window) >= self.max_workers * 2:
+                        count += 1
+                        yield result(window.popleft())
+
+                while window:
+                    count += 1
+                    yield result(window.popleft())
+            finally:
+                for future in window:
+                    future.cancel()
+                self._count(texts=count, seconds=time.time() - started)
+
+    def embed_many(self, texts: Iterable[str],
+                   on_error: Callable[[int, Exception], None] = None) -> List[Optional[List[float]]]:
+        """Embed many texts concurrently, preserving input order"""
+        return list(self.iter_embeddings(texts, on_error=on_error))
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Cumulative call counters plus texts/second throughput"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['throughput'] = stats['texts'] / stats['seconds'] if stats['seconds'] else 0.0
+        return stats
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                self._stats[name] += value
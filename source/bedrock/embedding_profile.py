@@ -0,0 +1,68 @@
+import os
+from typing import Dict
+
+TITAN_V2_MODEL = 'amazon.titan-embed-text-v2:0'
+TITAN_V1_MODEL = 'amazon.titan-embed-text-v1'
+
+# Output sizes each model can produce
+MODEL_DIMENSIONS = {
+    TITAN_V2_MODEL: (256, 512, 1024),
+    TITAN_V1_MODEL: (1536,)
+}
+
+class EmbeddingProfile:
+    """The embedding model, output dimensions and normalization used everywhere.
+
+    The pipeline, the app, BedrockHelper and S3VectorsNative all take their
+    settings from one profile so vectors written by one are comparable with
+    queries from another, and S3 Vectors indexes are created with the
+    matching dimension. ``from_env`` reads ``EMBEDDING_MODEL_ID``,
+    ``EMBEDDING_DIMENSIONS`` and ``EMBEDDING_NORMALIZE``.
+    """
+
+    def __init__(self, model_id: str = TITAN_V2_MODEL, dimensions: int = 1024, normalize: bool = True):
+        supported = MODEL_DIMENSIONS.get(model_id)
+        if supported is not None and dimensions not in supported:
+            raise ValueError(f"{model_id} supports dimensions {supported}, not {dimensions}")
+        self.model_id = model_id
+        self.dimensions = dimensions
+        self.normalize = normalize
+
+    @classmethod
+    def from_env(cls) -> 'EmbeddingProfile':
+        model_id = os.getenv('EMBEDDING_MODEL_ID', TITAN_V2_MODEL)
+        default_dimensions = MODEL_DIMENSIONS.get(model_id, (1024,))[-1]
+        return cls(
+            model_id=model_id,
+            dimensions=int(os.getenv('EMBEDDING_DIMENSIONS', str(default_dimensions))),
+            normalize=os.getenv('EMBEDDING_NORMALIZE', 'true').lower() in ('1', 'true', 'yes')
+        )
+
+    @property
+    def configurable(self) -> bool:
+        """Whether the model accepts dimensions/normalize in the request (Titan v2)"""
+        return 'embed-text-v2' in self.model_id
+
+    def request_body(self, text: str) -> Dict:
+        """Titan request body for this profile"""
+        body = {"inputText": text if text and text.strip() else "empty"}
+
+        # Titan v1 accepts only inputText
+        if self.configurable:
+            body["dimensions"] = self.dimensions
+            body["normalize"] = self.normalize
+
+        return body
+
+    def __eq__(self, other):
+        return isinstance(other, EmbeddingProfile) and (
+            (self.model_id, self.dimensions, self.normalize) == (other.model_id, other.dimensions, other.normalize)
+        )
+
+    def __hash__(self):
+        return hash((self.model_id, self.dimensions, self.normalize))
+
+    def __repr__(self):
+        return f"EmbeddingProfile({self.model_id!r}, dimensions={self.dimensions}, normalize={self.normalize})"
+
+DEFAULT_PROFILE = EmbeddingProfile.from_env()
@@ -0,0 +1,246 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+# Block nodes that start on a new line
+BLOCK_NODES = {
+    'paragraph', 'heading', 'codeBlock', 'blockquote', 'panel', 'rule', 'table',
+    'bulletList', 'orderedList', 'taskList', 'decisionList', 'expand', 'nestedExpand',
+    'mediaSingle', 'mediaGroup', 'blockCard', 'embedCard', 'layoutSection', 'layoutColumn'
+}
+
+# Inline nodes rendered from one of their attrs
+INLINE_ATTRS = {
+    'mention': 'text',
+    'emoji': 'text',
+    'status': 'text',
+    'placeholder': 'text',
+    'inlineCard': 'url',
+    'blockCard': 'url',
+    'embedCard': 'url',
+    'media': 'alt'
+}
+
+class _Lines:
+    """Output buffer of (prefix, text) lines.
+
+    Inside a table row (``cell_depth`` > 0) line breaks become spaces, so a
+    row's cells share one line whatever blocks they contain.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.prefix = ''
+        self.parts = []
+        self.marker = False
+        self.cell_depth = 0
+
+    def newline(self, prefix: str):
+        if self.cell_depth:
+            self.parts.append(' ')
+            return
+        # A line holding only a list marker keeps its prefix for the item's text
+        if self.parts and not self.marker:
+            self.flush()
+        if not self.parts:
+            self.prefix = prefix
+
+    def write(self, text: str, prefix: str):
+        if self.cell_depth:
+            self.parts.append(text.replace('\n', ' '))
+            self.marker = False
+            return
+        first, *rest = text.split('\n')
+        self.parts.append(first)
+        self.marker = False
+        for line in rest:
+            self.flush()
+            self.prefix = prefix
+            self.parts.append(line)
+
+    def write_marker(self, marker: str):
+        self.parts.append(marker)
+        self.marker = True
+
+    def end_row(self):
+        """Close a table row: collapse its whitespace onto one line"""
+        self.cell_depth -= 1
+        if not self.cell_depth:
+            self.parts = [' '.join(''.join(self.parts).split())]
+
+    def flush(self):
+        line = ''.join(self.parts).rstrip()
+        if line.strip():
+            self.lines.append(self.prefix + line)
+        self.parts = []
+        self.marker = False
+
+    def text(self) -> str:
+        self.flush()
+        return '\n'.join(self.lines)
+
+def adf_to_text(document: Any) -> str:
+    """Convert an Atlassian Document Format node (or plain string) to text.
+
+    Walks the tree with an explicit stack, so arbitrarily deep documents never
+    hit the recursion limit. Block nodes go on their own lines, list items get
+    ``-`` / ``1.`` / ``[ ]`` markers and nested indentation, blockquotes a
+    ``>`` prefix, table rows ``|``-separated cells, and inline nodes
+    (mentions, emoji, status lozenges, dates, cards) their display text.
+    Unknown nodes contribute their children's text.
+    """
+    if not document:
+        return ''
+    if isinstance(document, str):
+        return document
+    if not isinstance(document, dict):
+        return str(document)
+
+    out = _Lines()
+    # Entries are (node, line prefix), ('marker', (prefix, marker)), or a
+    # ('newline' / 'row' / 'cell' / 'row_end', prefix) instruction
+    stack = [(document, '')]
+
+    while stack:
+        node, prefix = stack.pop()
+        if node == 'marker':
+            item_prefix, marker = prefix
+            out.newline(item_prefix)
+            out.write_marker(marker)
+            continue
+        if node == 'newline':
+            out.newline(prefix)
+            continue
+        if node == 'row':
+            out.newline(prefix)
+            out.cell_depth += 1
+            continue
+        if node == 'cell':
+            out.write(' | ', prefix)
+            continue
+        if node == 'row_end':
+            out.end_row()
+            out.newline(prefix)
+            continue
+        if not isinstance(node, dict):
+            continue
+
+        node_type = node.get('type')
+        attrs = node.get('attrs') or {}
+        children = node.get('content') or []
+
+        if node_type == 'text':
+            out.write(node.get('text', ''), prefix)
+            continue
+        if node_type == 'hardBreak':
+            out.newline(prefix)
+            continue
+        if node_type == 'date':
+            out.write(_format_date(attrs.get('timestamp')), prefix)
+            continue
+        if node_type in INLINE_ATTRS and not children:
+            out.write(str(attrs.get(INLINE_ATTRS[node_type]) or attrs.get('shortName') or ''), prefix)
+            continue
+        if node_type == 'table':
+            # Cells go through this same walk, between row markers, in reverse so they pop in order
+            for row in reversed(children):
+                if not isinstance(row, dict):
+                    continue
+                stack.append(('row_end', prefix))
+                for i, cell in reversed(list(enumerate(row.get('content') or []))):
+                    stack.append((cell, prefix))
+                    if i:
+                        stack.append(('cell', prefix))
+                stack.append(('row', prefix))
+            continue
+
+        child_prefix = prefix
+        pending = []
+
+        if node_type in ('bulletList', 'orderedList', 'taskList', 'decisionList'):
+            start = attrs.get('order', 1) if node_type == 'orderedList' else 1
+            for number, item in enumerate(children, start):
+                pending.append((item, prefix, _list_marker(node_type, item, number)))
+        elif node_type in ('listItem', 'taskItem', 'decisionItem'):
+            child_prefix = prefix + '  '
+        elif node_type == 'blockquote':
+            child_prefix = prefix + '> '
+        elif node_type in ('expand', 'nestedExpand') and attrs.get('title'):
+            out.newline(prefix)
+            out.write(attrs['title'], prefix)
+
+        if node_type in BLOCK_NODES:
+            out.newline(child_prefix)
+
+        if pending:
+            # List items: push markers and items in reverse so they pop in order
+            for item, item_prefix, marker in reversed(pending):
+                stack.append((item, item_prefix))
+                stack.append(('marker', (item_prefix, marker)))
+            continue
+
+        if node_type in BLOCK_NODES:
+            stack.append(('newline', child_prefix))
+        for child in reversed(children):
+            stack.append((child, child_prefix))
+
+    return out.text()
+
+def _list_marker(list_type: str, item: Dict[str, Any], number: int) -> str:
+    if list_type == 'orderedList':
+        return f"{number}. "
+    if list_type == 'taskList':
+        return '[x] ' if (item.get('attrs') or {}).get('state') == 'DONE' else '[ ] '
+    return '- '
+
+def _format_date(timestamp) -> str:
+    try:
+        return datetime.fromtimestamp(int(timestamp) / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
+    except (TypeError, ValueError):
+        return ''
+
+class ADFTextCache:
+    """Converted description text keyed by issue key and ``updated`` stamp.
+
+    An unchanged issue is converted once per process no matter how many
+    stages (enrichment, chunking, re-syncs) ask for its text; a new
+    ``updated`` stamp produces a fresh conversion. Bounded LRU, thread-safe.
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_text(self, key: str, updated: str, description: Any) -> str:
+        """Plain text for an issue's description, converting on a miss"""
+        if not key or not isinstance(description, dict):
+            return adf_to_text(description)
+
+        cache_key = (key, updated)
+        with self._lock:
+            if cache_key in self._entries:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return self._entries[cache_key]
+            self.misses += 1
+
+        text = adf_to_text(description)
+        with self._lock:
+            self._entries[cache_key] = text
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return text
+
+_default_cache = ADFTextCache()
+
+def description_text(ticket: Dict[str, Any], cache: Optional[ADFTextCache] = None) -> str:
+    """Plain-text description of a parsed Jira ticket (``key``/``updated``/``description``)"""
+    return (cache or _default_cache).get_text(
+        ticket.get('key') or ticket.get('ticket_id', ''),
+        ticket.get('updated') or ticket.get('updated_date', ''),
+        ticket.get('description', '')
+    )
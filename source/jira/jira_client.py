@@ -1,90 +1,202 @@
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 import json
-from datetime import datetime, timedelta
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta, timezone
+from source.utils.adaptive_limiter import AIMDLimiter, Throttled
+
+# Jira Cloud answers 429 (rate limited) or 503 when asked to slow down
+THROTTLE_STATUS_CODES = {429, 503}
 
 class JiraClient:
-    def __init__(self, jira_url, email, api_token):
+    # Jira Cloud caps /search at 100 issues per page
+    PAGE_SIZE = 100
+    TICKET_FIELDS = 'key,summary,description,status,priority,assignee,components,created,updated'
+
+    def __init__(self, jira_url, email, api_token, max_workers=8, limiter=None, max_retries=5):
         self.jira_url = jira_url.rstrip('/')
         self.auth = HTTPBasicAuth(email, api_token)
         self.headers = {"Accept": "application/json"}
-    
+        # max_workers is the ceiling; the limiter finds how many pages Jira accepts at once
+        self.max_workers = max_workers
+        self.limiter = limiter or AIMDLimiter('jira', initial_limit=min(4, max_workers), max_limit=max_workers)
+        self.max_retries = max_retries
+
+        # Shared session so page fetches reuse pooled keep-alive connections
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
     def test_connection(self):
         """Test Jira connection"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.jira_url}/rest/api/3/myself",
-                headers=self.headers,
-                auth=self.auth,
                 timeout=10
             )
             return response.status_code == 200
         except:
             return False
-    
+
     def fetch_recent_tickets(self, limit=100, days_back=30):
-        """Fetch recent Jira tickets"""
+        """Fetch recent Jira tickets (limit=None fetches every matching ticket)"""
+        return list(self.iter_recent_tickets(limit=limit, days_back=days_back))
+
+    def iter_recent_tickets(self, limit=None, days_back=30):
+        """Yield recent Jira tickets page by page as they arrive"""
         try:
             # Calculate date range
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days_back)
-            
+
             # JQL query for recent tickets
             jql = f"created >= '{start_date.strftime('%Y-%m-%d')}' ORDER BY created DESC"
-            
-            response = requests.get(
-                f"{self.jira_url}/rest/api/3/search",
-                headers=self.headers,
-                auth=self.auth,
-                params={
-                    'jql': jql,
-                    'maxResults': limit,
-                    'fields': 'key,summary,description,status,priority,assignee,created,updated'
-                }
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                tickets = []
-                
-                for issue in data.get('issues', []):
-                    ticket = {
-                        'key': issue['key'],
-                        'summary': issue['fields'].get('summary', ''),
-                        'description': issue['fields'].get('description', ''),
-                        'status': issue['fields']['status']['name'] if issue['fields'].get('status') else '',
-                        'priority': issue['fields']['priority']['name'] if issue['fields'].get('priority') else '',
-                        'assignee': issue['fields']['assignee']['displayName'] if issue['fields'].get('assignee') else 'Unassigned',
-                        'created': issue['fields'].get('created', ''),
-                        'updated': issue['fields'].get('updated', '')
-                    }
-                    tickets.append(ticket)
-                
-                return tickets
-            else:
-                raise Exception(f"Failed to fetch tickets: {response.status_code}")
-                
+
+            for issue in self.iter_search(jql, fields=self.TICKET_FIELDS, limit=limit):
+                yield self._parse_issue(issue)
+
         except Exception as e:
             raise Exception(f"Error fetching Jira tickets: {str(e)}")
-    
+
+    def iter_updated_tickets(self, since, overlap_minutes=2, limit=None):
+        """Yield tickets updated at or after ``since`` (an aware datetime).
+
+        JQL interprets absolute dates in the Jira user's profile timezone, so
+        the window is expressed as a relative offset instead. A small overlap
+        guards against clock skew; re-upserting a ticket is harmless.
+        """
+        try:
+            elapsed = datetime.now(timezone.utc) - since
+            minutes = max(int(elapsed.total_seconds() // 60) + overlap_minutes, 1)
+
+            jql = f"updated >= -{minutes}m ORDER BY updated ASC"
+
+            for issue in self.iter_search(jql, fields=self.TICKET_FIELDS, limit=limit):
+                yield self._parse_issue(issue)
+
+        except Exception as e:
+            raise Exception(f"Error fetching updated Jira tickets: {str(e)}")
+
+    def fetch_ticket_keys(self, jql):
+        """Return the set of ticket keys matching a JQL query (keys only, cheap)"""
+        try:
+            return {issue['key'] for issue in self.iter_search(jql, fields='key')}
+        except Exception as e:
+            raise Exception(f"Error fetching ticket keys: {str(e)}")
+
     def search_tickets(self, jql_query, limit=50):
         """Search tickets with custom JQL"""
         try:
-            response = requests.get(
-                f"{self.jira_url}/rest/api/3/search",
-                headers=self.headers,
-                auth=self.auth,
-                params={
-                    'jql': jql_query,
-                    'maxResults': limit,
-                    'fields': 'key,summary,description,status,priority,assignee'
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json().get('issues', [])
-            else:
-                raise Exception(f"Search failed: {response.status_code}")
-                
+            return list(self.iter_search(
+                jql_query,
+                fields='key,summary,description,status,priority,assignee',
+                limit=limit
+            ))
         except Exception as e:
-            raise Exception(f"Error searching tickets: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error searching tickets: {str(e)}")
+
+    def iter_search(self, jql, fields, limit=None):
+        """Yield raw issues for a JQL query, fetching pages concurrently.
+
+        The first page reports ``total``; every remaining ``startAt`` offset is
+        then planned up front and fetched by a bounded worker pool. Issues are
+        yielded in the order their pages arrive, not in JQL order.
+        """
+        page_size = self.PAGE_SIZE if limit is None else min(limit, self.PAGE_SIZE)
+        first_page = self._search_page(jql, fields, 0, page_size)
+
+        total = first_page.get('total', 0)
+        if limit is not None:
+            total = min(total, limit)
+
+        seen = set()
+        remaining = total
+
+        def emit(issues):
+            nonlocal remaining
+            for issue in issues:
+                # Offsets can shift if tickets are created mid-fetch
+                if remaining <= 0 or issue['key'] in seen:
+                    continue
+                seen.add(issue['key'])
+                remaining -= 1
+                yield issue
+
+        yield from emit(first_page.get('issues', []))
+
+        # Jira may return fewer than requested per page; trust what it sent
+        step = len(first_page.get('issues', [])) or page_size
+        offsets = iter(range(step, total, step))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = set()
+
+            # Keep a bounded window of pages in flight so memory stays flat
+            for start_at in offsets:
+                pending.add(executor.submit(self._search_page, jql, fields, start_at, step))
+                if len(pending) >= self.max_workers * 2:
+                    break
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from emit(future.result().get('issues', []))
+                    next_start = next(offsets, None)
+                    if next_start is not None:
+                        pending.add(executor.submit(self._search_page, jql, fields, next_start, step))
+
+    def _search_page(self, jql, fields, start_at, max_results):
+        """Fetch a single page of search results, backing off when rate limited"""
+        params = {
+            'jql': jql,
+            'startAt': start_at,
+            'maxResults': max_results,
+            'fields': fields
+        }
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.limiter.call(self._get_page, params)
+            except Throttled as e:
+                if attempt == self.max_retries:
+                    raise Exception(f"Failed to fetch tickets: {e}")
+                delay = e.retry_after if e.retry_after is not None else random.uniform(0, min(30.0, 2 ** attempt))
+                time.sleep(delay)
+
+    def _get_page(self, params):
+        response = self.session.get(f"{self.jira_url}/rest/api/3/search", params=params, timeout=30)
+
+        if response.status_code in THROTTLE_STATUS_CODES:
+            raise Throttled(f"Jira returned {response.status_code}", retry_after=retry_after(response))
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch tickets: {response.status_code}")
+
+        return response.json()
+
+    def _parse_issue(self, issue):
+        """Flatten a raw Jira issue into a ticket dict"""
+        fields = issue['fields']
+        return {
+            'key': issue['key'],
+            'summary': fields.get('summary', ''),
+            'description': fields.get('description', ''),
+            'status': fields['status']['name'] if fields.get('status') else '',
+            'priority': fields['priority']['name'] if fields.get('priority') else '',
+            'assignee': fields['assignee']['displayName'] if fields.get('assignee') else 'Unassigned',
+            'components': [component['name'] for component in fields.get('components') or []],
+            'created': fields.get('created', ''),
+            'updated': fields.get('updated', '')
+        }
+
+def retry_after(response):
+    """Seconds from a Retry-After header, if it holds a number"""
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
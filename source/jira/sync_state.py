@@ -0,0 +1,94 @@
+import json
+import os
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+# Jira timestamps look like 2024-01-15T10:30:00.000+0000
+JIRA_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S.%f%z'
+
+class SyncWatermark:
+    """High-water mark of the Jira ``updated`` field for incremental syncs.
+
+    Stored as a small JSON document, either in the pipeline S3 bucket (when an
+    ``s3_client`` and ``bucket`` are given) or in a local file.
+    """
+
+    def __init__(self, s3_client=None, bucket=None, key='state/jira_watermark.json',
+                 local_path='.jira_watermark.json'):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.local_path = local_path
+
+    def load(self) -> Optional[datetime]:
+        """Return the stored watermark, or None if no sync has run yet"""
+        try:
+            if self.s3_client and self.bucket:
+                response = self.s3_client.get_object(Bucket=self.bucket, Key=self.key)
+                state = json.loads(response['Body'].read())
+            elif os.path.exists(self.local_path):
+                with open(self.local_path, 'r') as f:
+                    state = json.load(f)
+            else:
+                return None
+        except Exception as e:
+            if 'NoSuchKey' in str(e):
+                return None
+            raise
+
+        return datetime.fromisoformat(state['updated'])
+
+    def save(self, updated: datetime, ticket_count: int = 0):
+        """Persist a new watermark"""
+        state = {
+            'updated': updated.isoformat(),
+            'synced_at': datetime.now(timezone.utc).isoformat(),
+            'ticket_count': ticket_count
+        }
+
+        if self.s3_client and self.bucket:
+            self.s3_client.put_object(
+                Bucket=self.bucket,
+                Key=self.key,
+                Body=json.dumps(state),
+                ContentType='application/json'
+            )
+        else:
+            with open(self.local_path, 'w') as f:
+                json.dump(state, f)
+
+def parse_jira_timestamp(value: str) -> Optional[datetime]:
+    """Parse a Jira ``created``/``updated`` string into an aware datetime"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, JIRA_TIMESTAMP_FORMAT)
+    except ValueError:
+        return datetime.fromisoformat(value)
+
+def max_updated(tickets: Iterable[dict]) -> Optional[datetime]:
+    """Latest ``updated`` stamp across tickets.
+
+    Missing or unparseable stamps are skipped with a warning rather than
+    failing a sync whose vectors are already written.
+    """
+    latest = None
+    skipped = []
+    for ticket in tickets:
+        value = ticket.get('updated') or ''
+        try:
+            stamp = parse_jira_timestamp(value)
+        except (TypeError, ValueError):
+            skipped.append(ticket.get('key') or ticket.get('ticket_id') or '?')
+            continue
+        if stamp is None:
+            continue
+        if stamp.tzinfo is None:
+            # Jira always sends an offset; assume UTC for anything that does not
+            stamp = stamp.replace(tzinfo=timezone.utc)
+        if latest is None or stamp > latest:
+            latest = stamp
+
+    if skipped:
+        print(f"⚠️  Ignored unparseable updated stamps on {len(skipped)} tickets (e.g. {', '.join(skipped[:5])})")
+    return latest
@@ -1,7 +1,7 @@
 import boto3
-import json
 import os
-from typing import List, Dict
+from typing import List, Dict, Iterator
+from source.bedrock.claude_stream import stream_claude
 
 class BedrockKnowledgeBaseProper:
     def __init__(self, region_name: str = "us-east-1"):
@@ -12,6 +12,10 @@ class BedrockKnowledgeBaseProper:
     
     def query_knowledge_base(self, query: str, max_results: int = 5) -> str:
         """Query the Bedrock Knowledge Base and generate response"""
+        return "".join(self.stream_knowledge_base(query, max_results))
+    
+    def stream_knowledge_base(self, query: str, max_results: int = 5) -> Iterator[str]:
+        """Query the Bedrock Knowledge Base and stream the generated answer"""
         try:
             # Retrieve relevant documents
             retrieve_response = self.bedrock_agent_runtime.retrieve(
@@ -39,27 +43,10 @@ User question: {query}
 
 Please provide a helpful answer based on the ticket information above. If the information is not sufficient, say so."""
 
-            body = json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 1000,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            })
-            
-            response = self.bedrock_runtime.invoke_model(
-                modelId="anthropic.claude-3-sonnet-20240229-v1:0",
-                body=body
-            )
-            
-            response_body = json.loads(response['body'].read())
-            return response_body['content'][0]['text']
+            yield from stream_claude(self.bedrock_runtime, prompt, max_tokens=1000)
             
         except Exception as e:
-            return f"Error querying knowledge base: {str(e)}"
+            yield f"Error querying knowledge base: {str(e)}"
     
     def retrieve_similar_tickets(self, query: str, max_results: int = 5) -> List[Dict]:
         """Retrieve similar tickets without generation"""
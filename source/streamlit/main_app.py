@@ -1,9 +1,32 @@
 import streamlit as st
 import boto3
+import hashlib
 import json
+import os
+import sys
 import time
+from botocore.config import Config
 from datetime import datetime
 
+# Make the repo root importable when launched via `streamlit run`
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from source.bedrock.answer_cache import AnswerCache
+from source.bedrock.claude_stream import stream_claude
+from source.bedrock.embedding_cache import get_default_cache
+from source.bedrock.embedding_engine import EmbeddingEngine
+from source.utils.adaptive_limiter import AIMDLimiter, LimitedClient
+from source.utils.business_context import get_default_scorer
+from source.utils.query_orchestrator import QueryOrchestrator
+from source.utils.raw_ticket_reader import RawTicketReader
+from source.vector_store.ann_index import IVFIndex
+from source.vector_store.chunk_hits import collapse_chunk_hits
+from source.vector_store.embedding_store import EmbeddingStore
+from source.vector_store.lexical_index import BM25Index, reciprocal_rank_fusion
+from source.vector_store.metadata_filter import describe_filters, parse_question_filters, to_s3_filter
+from source.vector_store.local_index import LocalVectorIndex
+from source.vector_store.quantized_index import QuantizedIndex
+
 # Load financial context
 with open('source/config/financial_context.json', 'r') as f:
     FINANCIAL_CONFIG = json.load(f)
@@ -113,10 +136,38 @@ PIPELINE_S3_BUCKET = 'financial-jira-vectors-pipeline'
 VECTOR_BUCKET = 'financial-vectors-kb'
 INDEX_NAME = 'jira-tickets-enhanced'
 REGION = 'us-east-1'
+# Above this many tickets the local fallback switches from exact to IVF search
+LOCAL_ANN_THRESHOLD = int(os.getenv('LOCAL_ANN_THRESHOLD', '50000'))
+LOCAL_ANN_NPROBE = int(os.getenv('LOCAL_ANN_NPROBE', '16'))
+# 'float32', or 'int8' / 'binary' codes in memory, reranked against the on-disk store
+LOCAL_PRECISION = os.getenv('LOCAL_PRECISION', 'float32')
+# Connection pool per shared client; sized for parallel S3 reads
+CLIENT_POOL_SIZE = 32
+# Generated analyses are reused for repeated (or near-identical) questions
+ANSWER_CACHE_TTL = float(os.getenv('ANSWER_CACHE_TTL', '3600'))
+ANSWER_CACHE_SIMILARITY = float(os.getenv('ANSWER_CACHE_SIMILARITY', '0.95'))
+# S3 Vectors must answer within this many seconds or the local index result is used
+VECTOR_SEARCH_DEADLINE = float(os.getenv('VECTOR_SEARCH_DEADLINE', '2.0'))
+# Hybrid retrieval: candidates per retriever, fused results shown, and RRF weights
+HYBRID_CANDIDATES = 20
+HYBRID_TOP_K = 5
+HYBRID_VECTOR_WEIGHT = float(os.getenv('HYBRID_VECTOR_WEIGHT', '1.0'))
+HYBRID_KEYWORD_WEIGHT = float(os.getenv('HYBRID_KEYWORD_WEIGHT', '1.0'))
+# Chunk-level indexes: raw vector hits fetched per search, and how a ticket's
+# chunk scores combine ('max' = best chunk, 'sum' = all matched chunks)
+VECTOR_CANDIDATES = int(os.getenv('VECTOR_CANDIDATES', '30'))
+LOCAL_VECTOR_CANDIDATES = int(os.getenv('LOCAL_VECTOR_CANDIDATES', '100'))
+CHUNK_AGGREGATION = os.getenv('CHUNK_AGGREGATION', 'max')
+# Created-date filter choices, in days (None = any time)
+CREATED_WINDOWS = {'Any time': None, 'Last 7 days': 7, 'Last 30 days': 30, 'Last 90 days': 90}
 
 # Initialize session state
 if 'pipeline_tickets' not in st.session_state:
     st.session_state.pipeline_tickets = []
+if 'local_index' not in st.session_state:
+    st.session_state.local_index = None
+if 'corpus' not in st.session_state:
+    st.session_state.corpus = None
 if 'search_history' not in st.session_state:
     st.session_state.search_history = []
 if 'setup_complete' not in st.session_state:
@@ -126,10 +177,144 @@ if 'setup_running' not in st.session_state:
 if 'setup_mode' not in st.session_state:
     st.session_state.setup_mode = 'existing'
 
+# Process-wide resources: built once per Streamlit server and shared by every
+# session. boto3 clients and the read-only corpus/index are thread-safe to share;
+# sessions only hold references to them.
+
+# Services whose calls adapt their concurrency to throttling
+LIMITED_SERVICES = ('bedrock-runtime', 's3vectors')
+
+@st.cache_resource
+def get_aws_client(service_name):
+    """Shared boto3 client for one service"""
+    client = boto3.client(service_name, region_name=REGION, config=Config(max_pool_connections=CLIENT_POOL_SIZE))
+    if service_name in LIMITED_SERVICES:
+        return LimitedClient(client, get_limiter(service_name))
+    return client
+
+@st.cache_resource
+def get_limiter(service_name):
+    """Adaptive concurrency limit for one service, shared by all sessions"""
+    return AIMDLimiter(service_name, initial_limit=8, max_limit=CLIENT_POOL_SIZE)
+
+@st.cache_resource
+def get_embedding_engine():
+    """Titan v2 embedding engine backed by the shared embedding cache"""
+    return EmbeddingEngine(get_aws_client('bedrock-runtime'), cache=get_default_cache())
+
+@st.cache_resource
+def get_query_orchestrator():
+    """Thread pool and deadline for concurrent retrieval, shared by all sessions"""
+    return QueryOrchestrator(get_embedding_engine().embed, deadline_seconds=VECTOR_SEARCH_DEADLINE)
+
+@st.cache_resource
+def get_answer_cache():
+    """Analysis cache shared by all sessions"""
+    return AnswerCache(ttl_seconds=ANSWER_CACHE_TTL, similarity_threshold=ANSWER_CACHE_SIMILARITY)
+
+def listing_version(objects):
+    """Fingerprint of a raw-ticket listing; changes whenever any object does"""
+    digest = hashlib.sha1()
+    for obj in objects:
+        digest.update(f"{obj['Key']}|{obj.get('ETag', '')}|{obj.get('LastModified', '')}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_ticket_corpus(version, _objects, _progress=None):
+    """Shared, immutable ticket corpus and search index for one listing version
+
+    Objects are fetched in parallel; ``_progress(done, total, tickets)`` is
+    called as each object arrives. Incremental syncs re-upload updated tickets
+    under a new date prefix, so the newest copy of each ticket wins. Business
+    context is re-scored with the current rules rather than read from the
+    copy baked in at ingest.
+    """
+    reader = RawTicketReader(PIPELINE_S3_BUCKET, s3_client=get_aws_client('s3'), max_workers=CLIENT_POOL_SIZE)
+    
+    tickets_by_id = {}
+    # Keyword index grows batch by batch as objects arrive
+    lexical = BM25Index()
+    for batch, done, total in reader.iter_batches(_objects):
+        batch = [
+            ticket_data for ticket_data in batch
+            if ticket_data['ticket_id'] not in tickets_by_id
+            or tickets_by_id[ticket_data['ticket_id']]['updated'] <= ticket_data.get('updated_date', '')
+        ]
+        fresh = []
+        for ticket_data, context in zip(batch, get_default_scorer().score_many(batch)):
+            tickets_by_id[ticket_data['ticket_id']] = {
+                'id': ticket_data['ticket_id'],
+                'text': ticket_data['text'],
+                'summary': ticket_data['summary'],
+                'priority': ticket_data['priority'],
+                'status': ticket_data['status'],
+                'assignee': ticket_data['assignee'],
+                'component': ', '.join(ticket_data.get('components', [])),
+                'marketplace_impact': context['marketplace_impact'],
+                'customer_impact': context['customer_impact'],
+                'urgency_score': context['urgency_score'],
+                'created': ticket_data.get('created_date', ''),
+                'updated': ticket_data.get('updated_date', '')
+            }
+            fresh.append(tickets_by_id[ticket_data['ticket_id']])
+        lexical.add(fresh)
+        
+        if _progress:
+            _progress(done, total, len(tickets_by_id))
+    
+    tickets = tuple(tickets_by_id.values())
+    # Build the local fallback index once per data version, for all sessions
+    index = build_local_index(tickets) if tickets else None
+    
+    # Filter bitmaps are built up front so no query pays for them
+    if index is not None:
+        index.bitmaps.precompute()
+    lexical.bitmaps.precompute()
+    
+    return {
+        'version': version,
+        'tickets': tickets,
+        'by_id': {ticket['id']: ticket for ticket in tickets},
+        'index': index,
+        'lexical': lexical,
+        'filter_options': {field: lexical.bitmaps.values(field) for field in ('priority', 'status', 'component')},
+        'objects': len(_objects),
+        'loaded_at': datetime.now().strftime('%H:%M:%S')
+    }
+
+def build_local_index(tickets):
+    """Exact local index for small corpora, IVF approximate index for large ones"""
+    embedding_engine = get_embedding_engine()
+    # Prefer the pipeline's memory-mapped store when it covers the loaded tickets
+    # and was embedded with the same profile as queries will be
+    store = EmbeddingStore.open()
+    if (store is not None and store.model_id == embedding_engine.model_id
+            and store.dimension == embedding_engine.dimensions):
+        store_keys = store.keys.tolist()
+        if store_is_current(store, tickets):
+            if LOCAL_PRECISION != 'float32':
+                return QuantizedIndex.from_store(store, precision=LOCAL_PRECISION)
+            if len(store) >= LOCAL_ANN_THRESHOLD:
+                return IVFIndex.from_vectors(store_keys, store.vectors, store.metadata, nprobe=LOCAL_ANN_NPROBE)
+            return LocalVectorIndex.from_store(store)
+    
+    if len(tickets) >= LOCAL_ANN_THRESHOLD:
+        return IVFIndex.build(tickets, embedding_engine, nprobe=LOCAL_ANN_NPROBE)
+    return LocalVectorIndex.build(tickets, embedding_engine)
+
+def store_is_current(store, tickets):
+    """Whether the store holds every ticket at its loaded revision"""
+    # Stores written before rows carried an updated stamp cannot be checked
+    if 'id' not in store.metadata.values or 'updated' not in store.metadata.values:
+        return False
+    # Rows may be chunks; their records carry the ticket id
+    stored = dict(zip(store.metadata.column('id').tolist(), store.metadata.column('updated').tolist()))
+    return all(stored.get(ticket['id']) == ticket['updated'] for ticket in tickets)
+
 def check_setup_status():
     """Check if initial setup is complete"""
     try:
-        s3_client = boto3.client('s3', region_name=REGION)
+        s3_client = get_aws_client('s3')
         
         # Check if pipeline bucket exists and has data
         try:
@@ -181,172 +366,173 @@ def run_initial_setup(mode="existing"):
     except Exception as e:
         return False, f"Setup error: {str(e)}"
 
-def load_pipeline_tickets():
-    """Load tickets from pipeline S3 bucket"""
+def load_pipeline_tickets(progress=None):
+    """Point this session at the shared corpus for the current S3 listing"""
     try:
-        s3_client = boto3.client('s3', region_name=REGION)
+        reader = RawTicketReader(PIPELINE_S3_BUCKET, s3_client=get_aws_client('s3'))
+        objects = reader.list_objects()
         
-        response = s3_client.list_objects_v2(
-            Bucket=PIPELINE_S3_BUCKET,
-            Prefix='raw-tickets/'
-        )
+        # Unchanged listing -> cache hit; only the first session pays for the load
+        corpus = load_ticket_corpus(listing_version(objects), objects, progress)
         
-        tickets = []
-        for obj in response.get('Contents', [])[:100]:  # Load more tickets
-            ticket_response = s3_client.get_object(
-                Bucket=PIPELINE_S3_BUCKET,
-                Key=obj['Key']
-            )
-            
-            ticket_data = json.loads(ticket_response['Body'].read())
-            
-            tickets.append({
-                'id': ticket_data['ticket_id'],
-                'text': ticket_data['text'],
-                'summary': ticket_data['summary'],
-                'priority': ticket_data['priority'],
-                'status': ticket_data['status'],
-                'assignee': ticket_data['assignee'],
-                'marketplace_impact': ticket_data['business_context']['marketplace_impact'],
-                'customer_impact': ticket_data['business_context']['customer_impact'],
-                'urgency_score': ticket_data['business_context']['urgency_score']
-            })
+        st.session_state.corpus = corpus
+        st.session_state.pipeline_tickets = corpus['tickets']
+        st.session_state.local_index = corpus['index']
+        
+        # Answers generated against an older corpus are stale
+        get_answer_cache().invalidate(corpus['version'])
         
-        st.session_state.pipeline_tickets = tickets
-        return True, f"Loaded {len(tickets)} pipeline tickets"
+        return True, f"Loaded {len(corpus['tickets'])} pipeline tickets from {corpus['objects']} objects (as of {corpus['loaded_at']})"
         
     except Exception as e:
         return False, f"Error: {str(e)}"
 
-def hybrid_search(query_text):
-    """Hybrid search: Try S3 Vectors first, fallback to semantic search"""
+def render_load_progress():
+    """Progress bar callback for load_pipeline_tickets"""
+    bar = st.progress(0.0, text="Listing pipeline tickets...")
+    
+    def update(done, total, tickets):
+        bar.progress(done / total, text=f"Loaded {tickets} tickets ({done}/{total} objects)")
+    
+    return update
+
+def hybrid_search(query_text, filters=None):
+    """Hybrid search: vector results (S3 Vectors raced against the local index)
+    fused with BM25 keyword results by reciprocal-rank fusion, all restricted
+    to tickets matching ``filters``"""
+    local_index = st.session_state.local_index
+    primary = lambda embedding: s3_vectors_search(embedding, filters)
+    fallback = (lambda embedding: local_search(local_index, embedding, filters)) if local_index is not None else None
     
-    # Try S3 Vectors first
-    vector_results = try_s3_vectors_search(query_text)
-    if vector_results:
-        return vector_results
+    outcome = get_query_orchestrator().retrieve(query_text, primary, fallback)
     
-    # Fallback to semantic search on loaded data
-    return semantic_search_fallback(query_text)
+    if outcome['source'] == 'fallback':
+        st.warning(f"S3 Vectors search skipped: {outcome['error']}")
+    elif outcome['source'] is None and outcome['error']:
+        # Keyword results below still answer the question
+        st.warning(f"Vector search unavailable: {outcome['error']}")
+    
+    corpus = st.session_state.corpus
+    keyword_results = keyword_search(corpus['lexical'], query_text, filters) if corpus else []
+    
+    fused = reciprocal_rank_fusion(
+        {'vector': outcome['results'], 'keyword': keyword_results},
+        weights={'vector': HYBRID_VECTOR_WEIGHT, 'keyword': HYBRID_KEYWORD_WEIGHT},
+        top_k=HYBRID_TOP_K,
+        key=lambda result: result['ticket']['id']
+    )
+    for result in fused:
+        if len(result['ranks']) > 1:
+            result['source'] = f"{result['source']} + Keyword"
+    
+    outcome['results'] = fused
+    return outcome
 
-def try_s3_vectors_search(query_text):
-    """Try S3 Vectors search"""
-    try:
-        bedrock_runtime = boto3.client('bedrock-runtime', region_name=REGION)
-        s3vectors_client = boto3.client('s3vectors', region_name=REGION)
-        
-        # Generate query embedding
-        query_response = bedrock_runtime.invoke_model(
-            modelId='amazon.titan-embed-text-v2:0',
-            body=json.dumps({
-                "inputText": query_text,
-                "dimensions": 1024,
-                "normalize": True
-            })
-        )
-        
-        query_embedding = json.loads(query_response['body'].read())['embedding']
-        
-        # Search S3 Vectors
-        search_results = s3vectors_client.query_vectors(
+def keyword_search(lexical_index, query_text, filters=None):
+    """BM25 search over summary, description and component"""
+    matches = lexical_index.search(query_text, top_k=HYBRID_CANDIDATES, filters=filters)
+    if not matches:
+        return []
+    
+    # Scale BM25 scores to 0-1 so they display alongside cosine similarity
+    top_score = matches[0]['score']
+    return [
+        {
+            'ticket': match['metadata'],
+            'similarity': match['score'] / top_score,
+            'source': 'Keyword Search'
+        }
+        for match in matches
+    ]
+
+def s3_vectors_search(query_embedding, filters=None):
+    """S3 Vectors search; raises on failure (runs on a worker thread)"""
+    query_params = {
+        'vectorBucketName': VECTOR_BUCKET,
+        'indexName': INDEX_NAME,
+        'queryVector': {'float32': query_embedding},
+        'topK': VECTOR_CANDIDATES,
+        'returnMetadata': True
+    }
+    
+    # Filter server-side so the top-k is drawn only from matching tickets
+    metadata_filters = to_s3_filter(filters or {})
+    if metadata_filters:
+        query_params['metadataFilters'] = metadata_filters
+    
+    search_results = get_aws_client('s3vectors').query_vectors(**query_params)
+    
+    # Several chunks of one ticket can match; rank tickets, not chunks
+    matches = collapse_chunk_hits(
+        [
+            {'id': match['vectorKey'], 'score': match.get('similarityScore', 0), 'metadata': match.get('metadata', {})}
+            for match in search_results.get('vectorMatches', [])
+        ],
+        aggregate=CHUNK_AGGREGATION,
+        top_k=HYBRID_CANDIDATES
+    )
+    
+    # Format results
+    results = []
+    for match in matches:
+        metadata = match['metadata']
+        
+        results.append({
+            'ticket': {
+                'id': metadata.get('ticket_id', match['id']),
+                'summary': metadata.get('summary', 'No summary'),
+                'priority': metadata.get('priority', 'Unknown'),
+                'status': metadata.get('status', 'Unknown'),
+                'assignee': metadata.get('assignee', 'Unassigned'),
+                'component': ', '.join(metadata.get('component') or []),
+                'marketplace_impact': metadata.get('marketplace_impact', 'Unknown'),
+                'customer_impact': metadata.get('customer_impact', 'Unknown'),
+                'urgency_score': metadata.get('urgency_score', '0'),
+                'text': metadata.get('AMAZON_BEDROCK_TEXT', 'No content')
+            },
+            'similarity': match['score'],
+            'source': 'S3 Vectors'
+        })
+    
+    return results
+
+def local_search(local_index, query_embedding, filters=None):
+    """Semantic search on the loaded tickets' local index"""
+    matches = local_index.search(query_embedding, top_k=LOCAL_VECTOR_CANDIDATES, filters=filters)
+    return [
+        {
+            'ticket': match['metadata'],
+            'similarity': match['score'],
+            'source': 'Direct Search'
+        }
+        for match in collapse_chunk_hits(matches, aggregate=CHUNK_AGGREGATION, top_k=HYBRID_CANDIDATES)
+    ]
+
+def fetch_ticket_details(corpus, ticket_ids):
+    """Full ticket records for display: loaded corpus first, then S3 Vectors metadata"""
+    by_id = corpus['by_id'] if corpus else {}
+    details = {ticket_id: by_id[ticket_id] for ticket_id in ticket_ids if ticket_id in by_id}
+    
+    missing = [ticket_id for ticket_id in ticket_ids if ticket_id not in details]
+    if missing:
+        # Ticket-level vectors are keyed by ticket id, chunk-level ones by {id}_title
+        response = get_aws_client('s3vectors').get_vectors(
             vectorBucketName=VECTOR_BUCKET,
             indexName=INDEX_NAME,
-            queryVector={'float32': query_embedding},
-            topK=5
+            keys=missing + [f"{ticket_id}_title" for ticket_id in missing],
+            returnMetadata=True
         )
-        
-        matches = search_results.get('vectorMatches', [])
-        if not matches:
-            return None
-        
-        # Format results
-        results = []
-        for match in matches:
-            metadata = match.get('metadata', {})
-            
-            results.append({
-                'ticket': {
-                    'id': metadata.get('ticket_id', 'Unknown'),
-                    'summary': metadata.get('summary', 'No summary'),
-                    'priority': metadata.get('priority', 'Unknown'),
-                    'status': metadata.get('status', 'Unknown'),
-                    'assignee': metadata.get('assignee', 'Unassigned'),
-                    'marketplace_impact': metadata.get('marketplace_impact', 'Unknown'),
-                    'customer_impact': metadata.get('customer_impact', 'Unknown'),
-                    'urgency_score': metadata.get('urgency_score', '0'),
-                    'text': metadata.get('AMAZON_BEDROCK_TEXT', 'No content')
-                },
-                'similarity': match.get('similarityScore', 0),
-                'source': 'S3 Vectors'
-            })
-        
-        return results
-        
-    except Exception as e:
-        st.warning(f"S3 Vectors search failed: {e}")
-        return None
-
-def semantic_search_fallback(query_text):
-    """Fallback semantic search on loaded tickets"""
-    try:
-        if not st.session_state.pipeline_tickets:
-            return []
-        
-        bedrock_runtime = boto3.client('bedrock-runtime', region_name=REGION)
-        
-        # Generate query embedding
-        query_response = bedrock_runtime.invoke_model(
-            modelId='amazon.titan-embed-text-v2:0',
-            body=json.dumps({
-                "inputText": query_text,
-                "dimensions": 1024,
-                "normalize": True
-            })
-        )
-        
-        query_embedding = json.loads(query_response['body'].read())['embedding']
-        
-        results = []
-        
-        for ticket in st.session_state.pipeline_tickets:
-            # Generate ticket embedding
-            ticket_response = bedrock_runtime.invoke_model(
-                modelId='amazon.titan-embed-text-v2:0',
-                body=json.dumps({
-                    "inputText": ticket['text'],
-                    "dimensions": 1024,
-                    "normalize": True
-                })
-            )
-            
-            ticket_embedding = json.loads(ticket_response['body'].read())['embedding']
-            
-            # Calculate similarity
-            import numpy as np
-            
-            query_vec = np.array(query_embedding)
-            ticket_vec = np.array(ticket_embedding)
-            
-            similarity = np.dot(query_vec, ticket_vec) / (np.linalg.norm(query_vec) * np.linalg.norm(ticket_vec))
-            
-            results.append({
-                'ticket': ticket,
-                'similarity': similarity,
-                'source': 'Direct Search'
-            })
-        
-        # Sort by similarity
-        results.sort(key=lambda x: x['similarity'], reverse=True)
-        return results[:5]
-        
-    except Exception as e:
-        st.error(f"Fallback search error: {e}")
-        return []
+        for vector in response.get('vectors', []):
+            metadata = vector.get('metadata', {})
+            ticket_id = metadata.get('ticket_id', vector['key'])
+            details[ticket_id] = dict(metadata, id=ticket_id, text=metadata.get('AMAZON_BEDROCK_TEXT', ''))
+    
+    return details
 
 def generate_business_analysis(query_text, search_results):
-    """Generate business-focused analysis"""
+    """Stream a business-focused analysis, yielding text as Claude generates it"""
     try:
-        bedrock_runtime = boto3.client('bedrock-runtime', region_name=REGION)
+        bedrock_runtime = get_aws_client('bedrock-runtime')
         
         context = "\n".join([
             f"Ticket {r['ticket']['id']}: {r['ticket']['summary']}\n"
@@ -392,20 +578,10 @@ Provide analysis focusing on:
 
 Focus on financial services risk management and regulatory compliance."""
 
-        response = bedrock_runtime.invoke_model(
-            modelId='anthropic.claude-3-sonnet-20240229-v1:0',
-            body=json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 1200,
-                "messages": [{"role": "user", "content": prompt}]
-            })
-        )
-        
-        response_data = json.loads(response['body'].read())
-        return response_data['content'][0]['text']
+        yield from stream_claude(bedrock_runtime, prompt, max_tokens=1200)
         
     except Exception as e:
-        return f"Analysis generation failed: {e}"
+        yield f"Analysis generation failed: {e}"
 
 # Header
 st.markdown(f'<div class="main-header">💰 {FINANCIAL_CONFIG["app_name"]}</div>', unsafe_allow_html=True)
@@ -418,8 +594,7 @@ with st.sidebar:
     
     if not st.session_state.pipeline_tickets:
         if st.button("📊 Load Pipeline Data"):
-            with st.spinner("Loading pipeline tickets..."):
-                success, message = load_pipeline_tickets()
+            success, message = load_pipeline_tickets(render_load_progress())
             
             if success:
                 st.success(message)
@@ -431,8 +606,7 @@ with st.sidebar:
         st.success(f"✅ Tickets: {len(st.session_state.pipeline_tickets)}")
         
         if st.button("🔄 Refresh Data"):
-            with st.spinner("Refreshing..."):
-                success, message = load_pipeline_tickets()
+            success, message = load_pipeline_tickets(render_load_progress())
             if success:
                 st.success("Refreshed!")
                 st.rerun()
@@ -442,6 +616,16 @@ with st.sidebar:
     st.success("✅ Direct Search: Active")
     st.success("✅ Business Context: Enhanced")
     
+    cache_stats = get_default_cache().stats
+    st.caption(f"Embedding cache: {cache_stats['memory_hits'] + cache_stats['disk_hits']} hits, "
+               f"{cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate)")
+    answer_stats = get_answer_cache().stats
+    st.caption(f"Answer cache: {answer_stats['entries']} answers, {answer_stats['hit_rate']:.0%} hit rate")
+    for service_name in LIMITED_SERVICES:
+        limiter_stats = get_limiter(service_name).metrics
+        st.caption(f"{service_name}: {limiter_stats['limit']} concurrent calls, "
+                   f"{limiter_stats['throttle_rate']:.0%} throttled")
+    
     if st.session_state.pipeline_tickets:
         st.markdown('<div class="sidebar-header">📊 Risk Indicators</div>', unsafe_allow_html=True)
         
@@ -563,62 +747,123 @@ else:
         placeholder="e.g., What patterns indicate escalation risk in our marketplace?"
     )
     
+    # Explicit filters; anything left empty can still be inferred from the question
+    filter_options = st.session_state.corpus['filter_options']
+    with st.expander("🔎 Filters", expanded=False):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            selected_priorities = st.multiselect("Priority", filter_options['priority'])
+            min_urgency = st.slider("Minimum urgency", 0, 10, 0)
+        with col2:
+            selected_statuses = st.multiselect("Status", filter_options['status'])
+            created_window = st.selectbox("Created", list(CREATED_WINDOWS))
+        with col3:
+            selected_components = st.multiselect("Component", filter_options['component'])
+    
+    ui_filters = {}
+    if selected_priorities:
+        ui_filters['priority'] = selected_priorities
+    if selected_statuses:
+        ui_filters['status'] = selected_statuses
+    if selected_components:
+        ui_filters['component'] = selected_components
+    if min_urgency:
+        ui_filters['min_urgency'] = min_urgency
+    if CREATED_WINDOWS[created_window]:
+        ui_filters['created_after'] = time.time() - CREATED_WINDOWS[created_window] * 86400
+    
     if question:
+        filters = {**parse_question_filters(question, filter_options['component']), **ui_filters}
+        if filters:
+            st.caption(f"🔎 Filtering on {describe_filters(filters)}")
+        
         with st.spinner("🔍 Analyzing patterns with hybrid search..."):
             # Hybrid search
-            search_results = hybrid_search(question)
+            outcome = hybrid_search(question, filters)
+            search_results = outcome['results']
+        
+        if search_results:
+            # Ticket details load in the background while Claude streams
+            corpus = st.session_state.corpus
+            details_future = get_query_orchestrator().prefetch(
+                lambda ticket_ids: fetch_ticket_details(corpus, ticket_ids),
+                [r['ticket']['id'] for r in search_results]
+            )
             
-            if search_results:
-                # Generate business analysis
-                analysis = generate_business_analysis(question, search_results)
-                
-                # Display results
-                st.markdown('<div style="font-family: Inter, sans-serif; font-size: 1.5rem; font-weight: 700; color: #1f2937; margin: 2rem 0 1rem 0;">📊 Business Intelligence Analysis</div>', unsafe_allow_html=True)
-                st.markdown(f'<div class="analysis-text">{analysis}</div>', unsafe_allow_html=True)
+            # Display results; the analysis renders as Claude streams it
+            st.markdown('<div style="font-family: Inter, sans-serif; font-size: 1.5rem; font-weight: 700; color: #1f2937; margin: 2rem 0 1rem 0;">📊 Business Intelligence Analysis</div>', unsafe_allow_html=True)
+            
+            answer_cache = get_answer_cache()
+            # Search hits carry no updated stamp; the loaded corpus does
+            by_id = corpus['by_id'] if corpus else {}
+            fingerprint = AnswerCache.fingerprint([by_id.get(r['ticket']['id'], r['ticket']) for r in search_results])
+            query_embedding = outcome['embedding']
+            cached = answer_cache.get(question, fingerprint, query_embedding)
+            
+            if cached:
+                st.markdown(cached['answer'])
+                st.caption(f"⚡ Cached analysis from {cached['age_seconds'] / 60:.0f} min ago")
+            else:
+                analysis = st.write_stream(generate_business_analysis(question, search_results))
+                if "Analysis generation failed" not in analysis:
+                    answer_cache.put(question, fingerprint, analysis, query_embedding)
+            
+            st.markdown(f'<div style="font-family: Inter, sans-serif; font-size: 1.5rem; font-weight: 700; color: #1f2937; margin: 2rem 0 1rem 0;">🎫 Related Tickets ({len(search_results)} found)</div>', unsafe_allow_html=True)
+            
+            try:
+                ticket_details = details_future.result()
+            except Exception as e:
+                st.warning(f"Could not load ticket details: {e}")
+                ticket_details = {}
+            
+            for i, result in enumerate(search_results):
+                ticket = result['ticket']
+                similarity = result['similarity']
+                source = result['source']
                 
-                st.markdown(f'<div style="font-family: Inter, sans-serif; font-size: 1.5rem; font-weight: 700; color: #1f2937; margin: 2rem 0 1rem 0;">🎫 Related Tickets ({len(search_results)} found)</div>', unsafe_allow_html=True)
+                # Color code by urgency
+                urgency = int(ticket['urgency_score'])
+                if urgency >= 8:
+                    urgency_color = "🔴"
+                elif urgency >= 6:
+                    urgency_color = "🟡"
+                else:
+                    urgency_color = "🟢"
                 
-                for i, result in enumerate(search_results):
-                    ticket = result['ticket']
-                    similarity = result['similarity']
-                    source = result['source']
+                with st.expander(f"{urgency_color} **Ticket {i+1}:** {ticket['id']} - {ticket['summary']} *({source})*"):
+                    col1, col2, col3 = st.columns(3)
                     
-                    # Color code by urgency
-                    urgency = int(ticket['urgency_score'])
-                    if urgency >= 8:
-                        urgency_color = "🔴"
-                    elif urgency >= 6:
-                        urgency_color = "🟡"
-                    else:
-                        urgency_color = "🟢"
+                    with col1:
+                        st.write(f"**Priority:** {ticket['priority']}")
+                        st.write(f"**Status:** {ticket['status']}")
+                        st.write(f"**Urgency:** {ticket['urgency_score']}/10")
+                    with col2:
+                        st.write(f"**Assignee:** {ticket['assignee']}")
+                        st.write(f"**Similarity:** {similarity:.1%}")
+                        st.write(f"**Source:** {source}")
+                    with col3:
+                        st.write(f"**Marketplace:** {ticket['marketplace_impact']}")
+                        st.write(f"**Customer:** {ticket['customer_impact']}")
+                        if ticket.get('component'):
+                            st.write(f"**Component:** {ticket['component']}")
                     
-                    with st.expander(f"{urgency_color} **Ticket {i+1}:** {ticket['id']} - {ticket['summary']} *({source})*"):
-                        col1, col2, col3 = st.columns(3)
-                        
-                        with col1:
-                            st.write(f"**Priority:** {ticket['priority']}")
-                            st.write(f"**Status:** {ticket['status']}")
-                            st.write(f"**Urgency:** {ticket['urgency_score']}/10")
-                        with col2:
-                            st.write(f"**Assignee:** {ticket['assignee']}")
-                            st.write(f"**Similarity:** {similarity:.1%}")
-                            st.write(f"**Source:** {source}")
-                        with col3:
-                            st.write(f"**Marketplace:** {ticket['marketplace_impact']}")
-                            st.write(f"**Customer:** {ticket['customer_impact']}")
-                        
-                        st.write("**Summary:**")
-                        st.write(ticket['summary'])
-                
-                # Save to history
-                st.session_state.search_history.append({
-                    'question': question,
-                    'timestamp': datetime.now().strftime('%H:%M:%S'),
-                    'results_count': len(search_results),
-                    'source_mix': f"{len([r for r in search_results if r['source'] == 'S3 Vectors'])} vectors, {len([r for r in search_results if r['source'] == 'Direct Search'])} direct"
-                })
-            else:
-                st.warning("No relevant patterns found in current data.")
+                    st.write("**Summary:**")
+                    st.write(ticket['summary'])
+                    
+                    details = ticket_details.get(ticket['id'])
+                    if details and details.get('text'):
+                        st.write("**Details:**")
+                        st.write(details['text'])
+            
+            # Save to history
+            st.session_state.search_history.append({
+                'question': question,
+                'timestamp': datetime.now().strftime('%H:%M:%S'),
+                'results_count': len(search_results),
+                'source_mix': f"{len([r for r in search_results if 'S3 Vectors' in r['source']])} vectors, {len([r for r in search_results if 'Direct Search' in r['source']])} direct, {len([r for r in search_results if 'Keyword' in r['source']])} keyword"
+            })
+        else:
+            st.warning("No relevant patterns found in current data.")
 
 # Search history
 if st.session_state.search_history:
@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+from source.bedrock.embedding_engine import THROTTLING_ERROR_CODES, is_throttling_error
+
+class Throttled(Exception):
+    """Raised by HTTP callers when a service answers 429/503 (slow down)"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def is_throttle(error: Exception) -> bool:
+    """True for AWS throttling errors and Throttled responses"""
+    return isinstance(error, Throttled) or is_throttling_error(error)
+
+class TokenBucket:
+    """Blocking token bucket: at most ``rate`` acquisitions per second on
+    average, with bursts of up to ``burst``. ``rate=None`` never blocks."""
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate or 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+class AIMDLimiter:
+    """Adaptive cap on concurrent calls to one service.
+
+    The limit grows additively, by ``increase`` per limit's worth of
+    successful calls made while the limiter was full, and shrinks
+    multiplicatively by ``decrease`` when a call is throttled. Calls that
+    started before the last cut cannot cut it again, so a burst of
+    throttles from one overloaded wave halves the limit once rather than
+    collapsing it. A ``TokenBucket`` can cap the request rate as well (for
+    quotas stated in requests per second).
+
+    ``metrics`` exposes the current limit and the throttle rate over the
+    last ``window_seconds``.
+    """
+
+    def __init__(self, name: str, initial_limit: int = 4, min_limit: int = 1, max_limit: int = 64,
+                 increase: float = 1.0, decrease: float = 0.5, rate: Optional[float] = None,
+                 burst: Optional[float] = None, window_seconds: float = 60.0,
+                 is_throttle: Callable[[Exception], bool] = is_throttle):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max(min_limit, max_limit)
+        self.increase = increase
+        self.decrease = decrease
+        self.window_seconds = window_seconds
+        self.is_throttle = is_throttle
+        self.bucket = TokenBucket(rate, burst)
+
+        self._limit = float(min(max(initial_limit, min_limit), self.max_limit))
+        self._in_flight = 0
+        self._last_cut = 0.0
+        self._condition = threading.Condition()
+        self._recent = deque()
+        self._totals = {'calls': 0, 'throttles': 0, 'cuts': 0}
+        self._local = threading.local()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @contextmanager
+    def slot(self):
+        """Hold one concurrency slot (and one token) for the duration of a call.
+
+        Set ``slot.throttled = True`` on the yielded object, or raise an
+        error ``is_throttle`` recognizes, to report throttling.
+        """
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+            saturated = self._in_flight >= int(self._limit)
+        self.bucket.acquire()
+
+        slot = _Slot(time.monotonic(), saturated)
+        outer, self._local.slot = getattr(self._local, 'slot', None), slot
+        try:
+            yield slot
+        except Exception as e:
+            if self.is_throttle(e):
+                slot.throttled = True
+            raise
+        finally:
+            self._local.slot = outer
+            self._release(slot)
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn`` within a slot"""
+        with self.slot():
+            return fn(*args, **kwargs)
+
+    def mark_throttled(self):
+        """Report throttling for the call the current thread is making"""
+        slot = getattr(self._local, 'slot', None)
+        if slot is not None:
+            slot.throttled = True
+
+    def _release(self, slot):
+        now = time.monotonic()
+        with self._condition:
+            self._in_flight -= 1
+            self._totals['calls'] += 1
+            self._recent.append((now, slot.throttled))
+            while self._recent and self._recent[0][0] < now - self.window_seconds:
+                self._recent.popleft()
+
+            if slot.throttled:
+                self._totals['throttles'] += 1
+                if slot.started >= self._last_cut:
+                    self._limit = max(float(self.min_limit), self._limit * self.decrease)
+                    self._last_cut = now
+                    self._totals['cuts'] += 1
+            elif slot.saturated:
+                # Only raise the limit when it is what holds callers back
+                self._limit = min(float(self.max_limit), self._limit + self.increase / max(1, int(self._limit)))
+            self._condition.notify_all()
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        """Current limit, in-flight calls, totals and the recent throttle rate"""
+        with self._condition:
+            recent = len(self._recent)
+            throttled = sum(1 for _, was_throttled in self._recent if was_throttled)
+            return {
+                'name': self.name,
+                'limit': int(self._limit),
+                'in_flight': self._in_flight,
+                'calls': self._totals['calls'],
+                'throttles': self._totals['throttles'],
+                'cuts': self._totals['cuts'],
+                'throttle_rate': throttled / recent if recent else 0.0
+            }
+
+class _Slot:
+    __slots__ = ('started', 'saturated', 'throttled')
+
+    def __init__(self, started: float, saturated: bool):
+        self.started = started
+        self.saturated = saturated
+        self.throttled = False
+
+class LimitedClient:
+    """A boto3 client whose API calls all go through an AIMDLimiter.
+
+    Attribute access is forwarded to the wrapped client, so it can be passed
+    anywhere a client is expected. Throttled attempts that botocore retries
+    internally are reported to the limiter too, through a ``needs-retry``
+    hook, so they slow callers down even when the call finally succeeds.
+    """
+
+    # Client methods that do not call the service
+    LOCAL_METHODS = {'can_paginate', 'close', 'generate_presigned_url', 'generate_presigned_post',
+                     'get_paginator', 'get_waiter'}
+
+    def __init__(self, client, limiter: AIMDLimiter):
+        self._client = client
+        self.limiter = limiter
+
+        events = getattr(getattr(client, 'meta', None), 'events', None)
+        if events is not None:
+            events.register('needs-retry.*', self._on_needs_retry)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if name.startswith('_') or name in self.LOCAL_METHODS or not callable(attribute):
+            return attribute
+
+        def limited(*args, **kwargs):
+            return self.limiter.call(attribute, *args, **kwargs)
+        return limited
+
+    def _on_needs_retry(self, response=None, **kwargs):
+        if response is not None:
+            code = response[1].get('Error', {}).get('Code')
+            if code in THROTTLING_ERROR_CODES:
+                self.limiter.mark_throttled()
+        # Leave the retry decision to botocore
+        return None
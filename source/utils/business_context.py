@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import numpy as np
+from collections import Counter
+from typing import List, Dict, Any, Iterable
+from source.jira.adf import description_text
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'financial_context.json')
+
+# Keyword groups read from the config's business_context section
+GROUPS = {'risk': 'risk_indicators', 'urgency': 'urgency_signals', 'escalation': 'escalation_patterns'}
+ESCALATION_LEVELS = ('immediate', 'high', 'medium')
+MAX_URGENCY = 10
+
+def load_business_context(path: str = CONFIG_PATH) -> Dict[str, Any]:
+    with open(path, 'r') as f:
+        return json.load(f)['business_context']
+
+class BusinessContextScorer:
+    """Keyword-driven business context for tickets, compiled from config.
+
+    Every keyword in ``risk_indicators``, ``urgency_signals`` and
+    ``escalation_patterns`` is compiled into one regex, shaped as a
+    character trie so each word start is tested against one branch rather
+    than every keyword. Each ticket's summary and description are scanned
+    once; matches become a (tickets x phrases) count matrix that one matrix
+    product turns into per-category hit counts. A phrase also credits every shorter phrase it
+    contains, so "security breach" counts as "security" and "breach" too.
+
+    Urgency is the priority's base score from ``priority_scores`` plus the
+    ``urgency_scoring`` weight of each urgency signal present, capped at 10.
+    """
+
+    def __init__(self, business_context: Dict[str, Any]):
+        self.version = hashlib.sha1(json.dumps(business_context, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+        self.categories = [
+            (group, name)
+            for group, section in GROUPS.items()
+            for name in business_context.get(section, {})
+        ]
+        phrase_categories = {}
+        for column, (group, name) in enumerate(self.categories):
+            for phrase in business_context[GROUPS[group]][name]:
+                phrase_categories.setdefault(' '.join(phrase.lower().split()), set()).add(column)
+
+        self.phrases = sorted(phrase_categories, key=len, reverse=True)
+        self._phrase_index = {phrase: i for i, phrase in enumerate(self.phrases)}
+        self._pattern = re.compile(r'\b(' + _trie_pattern(self.phrases) + r')(?:s|es)?\b')
+
+        # Phrase -> category membership, including phrases contained in longer ones
+        self._membership = np.zeros((len(self.phrases), len(self.categories)), dtype=np.int32)
+        for i, phrase in enumerate(self.phrases):
+            for other, columns in phrase_categories.items():
+                if other == phrase or re.search(rf'\b{re.escape(other)}\b', phrase):
+                    self._membership[i, list(columns)] = 1
+
+        weights = business_context.get('urgency_scoring', {})
+        self._urgency_columns = [i for i, (group, _) in enumerate(self.categories) if group == 'urgency']
+        self._urgency_weights = np.array(
+            [weights.get(self.categories[i][1], 0) for i in self._urgency_columns], dtype=np.int32
+        )
+        self.priority_scores = business_context.get('priority_scores', {})
+        self._columns = {category: i for i, category in enumerate(self.categories)}
+
+    @classmethod
+    def from_config(cls, path: str = CONFIG_PATH) -> 'BusinessContextScorer':
+        return cls(load_business_context(path))
+
+    def score(self, ticket: Dict[str, Any]) -> Dict[str, Any]:
+        return self.score_many([ticket])[0]
+
+    def score_many(self, tickets: Iterable[Dict[str, Any]], batch_size: int = 10000) -> List[Dict[str, Any]]:
+        """Business context for each ticket (raw Jira or enhanced records)"""
+        tickets = list(tickets)
+        results = []
+        for start in range(0, len(tickets), batch_size):
+            results.extend(self._score_batch(tickets[start:start + batch_size]))
+        return results
+
+    def _score_batch(self, tickets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        texts = [f"{ticket.get('summary', '')}\n{description_text(ticket)}".lower() for ticket in tickets]
+
+        # One regex scan per ticket; Counter tallies repeated phrases in C
+        ticket_rows = []
+        phrase_columns = []
+        phrase_totals = []
+        for row, text in enumerate(texts):
+            for phrase, total in Counter(self._pattern.findall(text)).items():
+                column = self._phrase_index.get(phrase)
+                if column is None:
+                    # Matched across a line break or repeated spaces
+                    column = self._phrase_index[' '.join(phrase.split())]
+                ticket_rows.append(row)
+                phrase_columns.append(column)
+                phrase_totals.append(total)
+
+        phrase_counts = np.zeros((len(tickets), len(self.phrases)), dtype=np.int32)
+        np.add.at(phrase_counts, (ticket_rows, phrase_columns), phrase_totals)
+        counts = phrase_counts @ self._membership
+
+        priority_base = np.array([self._priority_score(ticket.get('priority', '')) for ticket in tickets], dtype=np.int32)
+        urgency = np.minimum(priority_base + (counts[:, self._urgency_columns] > 0) @ self._urgency_weights, MAX_URGENCY)
+
+        def hit(group, name):
+            column = self._columns.get((group, name))
+            return counts[:, column] > 0 if column is not None else np.zeros(len(tickets), dtype=bool)
+
+        marketplace = np.select(
+            [hit('risk', 'system_keywords') | hit('risk', 'high_priority_keywords') | hit('escalation', 'immediate'),
+             hit('risk', 'performance_keywords') | hit('escalation', 'medium')],
+            ['High - Critical financial system', 'Medium - Performance impact'],
+            'Low - Standard impact'
+        )
+        customer = np.select(
+            [hit('risk', 'customer_keywords') | hit('urgency', 'customer_funds_impact'),
+             hit('risk', 'access_keywords')],
+            ['High - Customer funds affected', 'Medium - Access issues'],
+            'Low - Backend impact'
+        )
+        escalation = np.select([hit('escalation', level) for level in ESCALATION_LEVELS], ESCALATION_LEVELS, '')
+
+        hits = [{} for _ in tickets]
+        for row, column in zip(*np.nonzero(counts)):
+            group, name = self.categories[column]
+            hits[row].setdefault(group, {})[name] = int(counts[row, column])
+
+        return [
+            {
+                'marketplace_impact': str(marketplace[row]),
+                'customer_impact': str(customer[row]),
+                'urgency_score': int(urgency[row]),
+                'escalation': str(escalation[row]) or None,
+                'hits': hits[row],
+                'scoring_version': self.version
+            }
+            for row in range(len(tickets))
+        ]
+
+    def _priority_score(self, priority: str) -> int:
+        priority = (priority or '').lower()
+        for name, score in self.priority_scores.items():
+            if name in priority:
+                return score
+        return 0
+
+def _trie_pattern(phrases: List[str]) -> str:
+    """Regex alternation of phrases, factored by common prefix (longest match wins)"""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = []
+        for char in sorted(node):
+            if char:
+                piece = r'\s+' if char == ' ' else re.escape(char)
+                branches.append(piece + build(node[char]))
+        if not branches:
+            return ''
+        # A phrase ending here is the fallback once longer continuations fail
+        optional = '' in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')' + ('?' if optional else '')
+
+    return build(trie)
+
+_default_scorer = None
+_default_scorer_lock = threading.Lock()
+
+def get_default_scorer() -> BusinessContextScorer:
+    """Process-wide scorer compiled from financial_context.json"""
+    global _default_scorer
+    with _default_scorer_lock:
+        if _default_scorer is None:
+            _default_scorer = BusinessContextScorer.from_config()
+        return _default_scorer
@@ -10,6 +10,13 @@ import os
 from dotenv import load_dotenv
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+import sys
+
+# Make the repo root importable when run as `python3 source/utils/jira_bulk_loader.py`
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from source.jira.jira_client import THROTTLE_STATUS_CODES, retry_after
+from source.utils.adaptive_limiter import AIMDLimiter, Throttled
 
 # Load environment
 load_dotenv()
@@ -68,16 +75,17 @@ class FastJiraBulkLoader:
         
         return {"fields": fields}
     
-    def create_single_ticket(self, ticket_data):
-        """Create single ticket - thread-safe"""
+    def create_single_ticket(self, ticket_data, limiter=None, max_retries=5):
+        """Create single ticket - thread-safe, retrying when Jira rate limits"""
         try:
-            response = requests.post(
-                f"{self.jira_url}/rest/api/3/issue",
-                headers=self.headers,
-                auth=self.auth,
-                data=json.dumps(ticket_data),
-                timeout=10
-            )
+            for attempt in range(max_retries + 1):
+                try:
+                    response = limiter.call(self._post_ticket, ticket_data) if limiter else self._post_ticket(ticket_data)
+                    break
+                except Throttled as e:
+                    if attempt == max_retries:
+                        raise
+                    time.sleep(e.retry_after if e.retry_after is not None else random.uniform(0, min(30.0, 2 ** attempt)))
             
             with self.lock:
                 if response.status_code == 201:
@@ -94,9 +102,22 @@ class FastJiraBulkLoader:
                 self.failed_count += 1
             return False
     
-    def fast_bulk_load(self, count=1000, max_workers=20):
-        """Load tickets in parallel"""
-        print(f"🚀 Fast loading {count} tickets with {max_workers} parallel workers")
+    def _post_ticket(self, ticket_data):
+        response = requests.post(
+            f"{self.jira_url}/rest/api/3/issue",
+            headers=self.headers,
+            auth=self.auth,
+            data=json.dumps(ticket_data),
+            timeout=10
+        )
+        if response.status_code in THROTTLE_STATUS_CODES:
+            raise Throttled(f"Jira returned {response.status_code}", retry_after=retry_after(response))
+        return response
+    
+    def fast_bulk_load(self, count=1000, max_workers=64):
+        """Load tickets in parallel, as many at once as Jira accepts (up to max_workers)"""
+        limiter = AIMDLimiter('jira', initial_limit=min(4, max_workers), max_limit=max_workers)
+        print(f"🚀 Fast loading {count} tickets with up to {max_workers} parallel workers")
         
         start_time = time.time()
         
@@ -109,7 +130,7 @@ class FastJiraBulkLoader:
         
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # Submit all tasks
-            futures = [executor.submit(self.create_single_ticket, ticket) for ticket in tickets]
+            futures = [executor.submit(self.create_single_ticket, ticket, limiter) for ticket in tickets]
             
             # Wait for completion with progress
             completed = 0
@@ -119,7 +140,9 @@ class FastJiraBulkLoader:
                     elapsed = time.time() - start_time
                     rate = completed / elapsed
                     eta = (count - completed) / rate if rate > 0 else 0
-                    print(f"🔄 Progress: {completed}/{count} ({rate:.1f}/sec, ETA: {eta:.0f}s)")
+                    metrics = limiter.metrics
+                    print(f"🔄 Progress: {completed}/{count} ({rate:.1f}/sec, ETA: {eta:.0f}s, "
+                          f"{metrics['limit']} in flight, {metrics['throttle_rate']:.0%} throttled)")
         
         elapsed_time = time.time() - start_time
         
@@ -127,6 +150,8 @@ class FastJiraBulkLoader:
         print(f"✅ Successfully created: {self.created_count} tickets")
         print(f"❌ Failed: {self.failed_count} tickets")
         print(f"⚡ Rate: {self.created_count/elapsed_time:.1f} tickets/second")
+        metrics = limiter.metrics
+        print(f"🚦 Settled at {metrics['limit']} concurrent requests ({metrics['throttles']} rate-limited responses)")
         
         return self.created_count
 
@@ -137,10 +162,10 @@ def main():
     # Get count
     try:
         count = int(input("📊 How many tickets? (default 1000): ") or "1000")
-        workers = int(input("🔧 Parallel workers? (default 20): ") or "20")
+        workers = int(input("🔧 Max parallel workers? (default 64, adapts to rate limits): ") or "64")
     except ValueError:
         count = 1000
-        workers = 20
+        workers = 64
     
     if count > 2000:
         print("⚠️ Warning: >2000 tickets may hit API rate limits")
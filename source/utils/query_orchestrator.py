@@ -0,0 +1,81 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+SearchFn = Callable[[List[float]], List[Dict[str, Any]]]
+
+class QueryOrchestrator:
+    """Overlaps the independent calls behind one analyst question.
+
+    ``retrieve`` embeds the query once and then runs the primary search
+    (S3 Vectors) and the fallback search (local index) at the same time. The
+    primary result is used if it arrives, non-empty, within
+    ``deadline_seconds``; otherwise the fallback result is used without
+    waiting for the primary to fail. ``prefetch`` starts fetching ticket
+    details in the background so the caller can start generation straight
+    away. The thread pool is meant to be shared process-wide.
+    """
+
+    def __init__(self, embed: Callable[[str], List[float]], deadline_seconds: float = 2.0, max_workers: int = 16):
+        self.embed = embed
+        self.deadline_seconds = deadline_seconds
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='query')
+
+    def retrieve(self, query_text: str, primary: SearchFn, fallback: Optional[SearchFn] = None) -> Dict[str, Any]:
+        """Race primary against fallback.
+
+        Returns ``{'results', 'source', 'embedding', 'error', 'timings'}`` where
+        ``source`` is ``'primary'``, ``'fallback'`` or None, and ``error``
+        explains why the primary result was not used. Failures never raise;
+        they leave ``results`` empty and are described in ``error``.
+        """
+        started = time.time()
+        outcome = {'results': [], 'source': None, 'embedding': None, 'error': None, 'timings': {}}
+
+        try:
+            embedding = self.embed(query_text)
+        except Exception as e:
+            outcome['error'] = f'query embedding failed: {e}'
+            outcome['timings']['embed'] = outcome['timings']['total'] = time.time() - started
+            return outcome
+        outcome['embedding'] = embedding
+        outcome['timings']['embed'] = time.time() - started
+
+        # The deadline covers the searches only, so a slow embed does not eat the primary's budget
+        searches_started = time.time()
+        primary_future = self._timed(primary, embedding, outcome['timings'], 'primary')
+        fallback_future = self._timed(fallback, embedding, outcome['timings'], 'fallback') if fallback else None
+
+        remaining = max(0.0, self.deadline_seconds - (time.time() - searches_started))
+        try:
+            results = primary_future.result(timeout=remaining)
+            if results:
+                outcome.update(results=results, source='primary')
+            else:
+                outcome['error'] = 'no matches'
+        except FutureTimeoutError:
+            outcome['error'] = f'no response within {self.deadline_seconds:.1f}s'
+        except Exception as e:
+            outcome['error'] = str(e)
+
+        if outcome['source'] is None and fallback_future is not None:
+            try:
+                outcome.update(results=fallback_future.result(), source='fallback')
+            except Exception as e:
+                outcome['error'] = f"{outcome['error']}; fallback failed: {e}"
+
+        outcome['timings']['total'] = time.time() - started
+        return outcome
+
+    def prefetch(self, fetch: Callable[[List[str]], Dict[str, Dict[str, Any]]], ids: List[str]) -> Future:
+        """Fetch details for ids in the background; returns a Future of {id: details}"""
+        return self.executor.submit(fetch, ids)
+
+    def _timed(self, fn: SearchFn, embedding: List[float], timings: Dict[str, float], name: str) -> Future:
+        def run():
+            started = time.time()
+            try:
+                return fn(embedding)
+            finally:
+                timings[name] = time.time() - started
+        return self.executor.submit(run)
@@ -0,0 +1,68 @@
+import boto3
+import gzip
+import json
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from typing import List, Dict, Any, Iterator, Tuple
+from source.utils.raw_ticket_writer import RAW_TICKET_PREFIX
+
+class RawTicketReader:
+    """Parallel reader for tickets written by RawTicketWriter.
+
+    Lists every key under ``raw-tickets/`` (following continuation tokens),
+    then fetches objects concurrently. Per-ticket ``.json`` objects and
+    ``.jsonl.gz`` shards can be mixed under the same prefix.
+    """
+
+    def __init__(self, bucket: str, s3_client=None, region: str = 'us-east-1', max_workers: int = 32):
+        self.bucket = bucket
+        self.s3_client = s3_client or boto3.client(
+            's3', region_name=region, config=Config(max_pool_connections=max_workers)
+        )
+        self.max_workers = max_workers
+
+    def list_objects(self, prefix: str = RAW_TICKET_PREFIX) -> List[Dict[str, Any]]:
+        """Every ticket object under prefix (all listing pages)"""
+        objects = []
+        params = {'Bucket': self.bucket, 'Prefix': prefix}
+
+        while True:
+            response = self.s3_client.list_objects_v2(**params)
+            objects.extend(
+                obj for obj in response.get('Contents', [])
+                if obj['Key'].endswith('.json') or obj['Key'].endswith('.jsonl.gz')
+            )
+            if not response.get('IsTruncated'):
+                return objects
+            params['ContinuationToken'] = response['NextContinuationToken']
+
+    def iter_batches(self, objects: List[Dict[str, Any]] = None) -> Iterator[Tuple[List[Dict[str, Any]], int, int]]:
+        """Yield (tickets, objects_done, objects_total) as each object arrives"""
+        if objects is None:
+            objects = self.list_objects()
+        total = len(objects)
+        keys = iter(obj['Key'] for obj in objects)
+        done = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {executor.submit(self.read_object, key) for key in islice(keys, self.max_workers * 2)}
+
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done += 1
+                    yield future.result(), done, total
+                    next_key = next(keys, None)
+                    if next_key is not None:
+                        pending.add(executor.submit(self.read_object, next_key))
+
+    def read_object(self, key: str) -> List[Dict[str, Any]]:
+        """Tickets stored in one object"""
+        body = self.s3_client.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+
+        if key.endswith('.jsonl.gz'):
+            lines = gzip.decompress(body).decode('utf-8').splitlines()
+            return [json.loads(line) for line in lines if line.strip()]
+
+        return [json.loads(body)]
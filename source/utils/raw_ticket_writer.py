@@ -0,0 +1,95 @@
+import boto3
+import gzip
+import json
+import time
+from botocore.config import Config
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Iterable
+
+RAW_TICKET_PREFIX = 'raw-tickets/'
+LAYOUTS = ('objects', 'jsonl')
+
+class RawTicketWriter:
+    """Bulk writer for enhanced tickets in the pipeline S3 bucket.
+
+    Two layouts are supported:
+
+    - ``objects``: one JSON object per ticket at
+      ``raw-tickets/YYYY/MM/DD/<ticket_id>.json`` (the original layout)
+    - ``jsonl``: gzipped newline-delimited JSON shards per day at
+      ``raw-tickets/YYYY/MM/DD/part-<run>-0001.jsonl.gz``, which needs
+      hundreds of times fewer requests for the same tickets
+
+    Uploads fan out over a thread pool; the S3 client's connection pool is
+    sized to match so workers never queue for a connection.
+    """
+
+    def __init__(self, bucket: str, s3_client=None, region: str = 'us-east-1', layout: str = 'objects',
+                 max_workers: int = 32, shard_size: int = 5000):
+        if layout not in LAYOUTS:
+            raise ValueError(f"layout must be one of {LAYOUTS}")
+        self.bucket = bucket
+        self.s3_client = s3_client or self.make_client(region, max_workers)
+        self.layout = layout
+        self.max_workers = max_workers
+        self.shard_size = shard_size
+        # Distinguishes shards from different runs on the same day
+        self.run_id = datetime.now().strftime('%H%M%S')
+        self._shard_count = 0
+
+    @staticmethod
+    def make_client(region: str, max_workers: int):
+        """S3 client with one pooled connection per upload worker"""
+        return boto3.client('s3', region_name=region, config=Config(max_pool_connections=max_workers))
+
+    def write(self, tickets: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Upload tickets; returns {'tickets', 'objects', 'seconds'}"""
+        started = time.time()
+        day = datetime.now().strftime('%Y/%m/%d')
+        report = {'tickets': 0, 'objects': 0, 'seconds': 0.0}
+
+        if self.layout == 'objects':
+            uploads = ((f"{RAW_TICKET_PREFIX}{day}/{t['ticket_id']}.json", [t]) for t in tickets)
+        else:
+            uploads = self._shards(tickets, day)
+
+        window = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for key, batch in uploads:
+                window.append(executor.submit(self._put, key, batch))
+                if len(window) >= self.max_workers * 2:
+                    report['tickets'] += window.popleft().result()
+                    report['objects'] += 1
+            while window:
+                report['tickets'] += window.popleft().result()
+                report['objects'] += 1
+
+        report['seconds'] = time.time() - started
+        return report
+
+    def _shards(self, tickets: Iterable[Dict[str, Any]], day: str):
+        shard = []
+        for ticket in tickets:
+            shard.append(ticket)
+            if len(shard) >= self.shard_size:
+                yield self._shard_key(day), shard
+                shard = []
+        if shard:
+            yield self._shard_key(day), shard
+
+    def _shard_key(self, day: str) -> str:
+        self._shard_count += 1
+        return f"{RAW_TICKET_PREFIX}{day}/part-{self.run_id}-{self._shard_count:04d}.jsonl.gz"
+
+    def _put(self, key: str, batch: List[Dict[str, Any]]) -> int:
+        if self.layout == 'objects':
+            body, extra = json.dumps(batch[0]), {'ContentType': 'application/json'}
+        else:
+            lines = '\n'.join(json.dumps(ticket) for ticket in batch) + '\n'
+            body = gzip.compress(lines.encode('utf-8'))
+            extra = {'ContentType': 'application/gzip'}
+
+        self.s3_client.put_object(Bucket=self.bucket, Key=key, Body=body, **extra)
+        return len(batch)
@@ -0,0 +1,181 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+_DONE = object()
+
+class _Stopped(Exception):
+    """Raised inside workers when another stage has failed"""
+
+class StreamingPipeline:
+    """Linear chain of concurrent stages connected by bounded queues.
+
+    Every stage runs in its own worker threads and hands items downstream
+    through a ``queue.Queue(maxsize=queue_size)``. A slow stage fills its
+    input queue and blocks the stages above it (backpressure), so memory stays
+    bounded by the queue sizes rather than the corpus size, and wall-clock
+    time approaches that of the slowest stage instead of the sum of all.
+
+    Example::
+
+        stats = (StreamingPipeline(iter_tickets())
+                 .map('enrich', enhance_ticket)
+                 .map('embed', embed_ticket, workers=16)
+                 .batch('store', put_batch, size=100)
+                 .run())
+    """
+
+    def __init__(self, source: Iterable[Any], queue_size: int = 256):
+        self.source = source
+        self.queue_size = queue_size
+        self.stages = []
+        self.stats = {'source': {'items_in': 0, 'items_out': 0, 'busy_seconds': 0.0}}
+        self._stop = threading.Event()
+        self._errors = []
+        self._lock = threading.Lock()
+
+    def map(self, name: str, fn: Callable[[Any], Any], workers: int = 1) -> 'StreamingPipeline':
+        """One output per input; returning None drops the item"""
+        return self._add(name, 'map', fn, workers)
+
+    def flat_map(self, name: str, fn: Callable[[Any], Iterable[Any]], workers: int = 1) -> 'StreamingPipeline':
+        """Zero or more outputs per input"""
+        return self._add(name, 'flat_map', fn, workers)
+
+    def batch(self, name: str, fn: Callable[[List[Any]], Optional[Iterable[Any]]], size: int,
+              workers: int = 1) -> 'StreamingPipeline':
+        """Call fn on lists of up to ``size`` items; fn may return outputs"""
+        return self._add(name, 'batch', fn, workers, size)
+
+    def run(self, sink: Callable[[Any], None] = None) -> Dict[str, Dict[str, float]]:
+        """Run all stages to completion and return per-stage stats.
+
+        Outputs of the last stage go to ``sink`` (called from worker threads).
+        The first exception raised by any stage stops the pipeline and is
+        re-raised here.
+        """
+        if not self.stages:
+            raise ValueError("pipeline needs at least one stage")
+
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        remaining = [stage['workers'] for stage in self.stages]
+        threads = []
+        started = time.time()
+
+        def feed():
+            try:
+                for item in self.source:
+                    self._put(queues[0], item)
+                    self._count('source', items_out=1)
+            except _Stopped:
+                return
+            except Exception as e:
+                self._fail(e)
+                return
+            for _ in range(self.stages[0]['workers']):
+                self._put(queues[0], _DONE, force=True)
+
+        def work(index):
+            stage = self.stages[index]
+            downstream = queues[index + 1] if index + 1 < len(queues) else None
+
+            def emit(outputs):
+                for output in outputs:
+                    if output is None:
+                        continue
+                    self._count(stage['name'], items_out=1)
+                    if downstream is not None:
+                        self._put(downstream, output)
+                    elif sink is not None:
+                        sink(output)
+
+            buffer = []
+            try:
+                while True:
+                    item = self._get(queues[index])
+                    if item is _DONE:
+                        break
+                    self._count(stage['name'], items_in=1)
+
+                    busy = time.time()
+                    if stage['kind'] == 'map':
+                        emit([stage['fn'](item)])
+                    elif stage['kind'] == 'flat_map':
+                        emit(stage['fn'](item))
+                    else:
+                        buffer.append(item)
+                        if len(buffer) >= stage['size']:
+                            emit(stage['fn'](buffer) or [])
+                            buffer = []
+                    self._count(stage['name'], busy_seconds=time.time() - busy)
+
+                if buffer:
+                    emit(stage['fn'](buffer) or [])
+            except _Stopped:
+                return
+            except Exception as e:
+                self._fail(e)
+                return
+
+            # The last worker of a stage closes the next stage's input
+            with self._lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last and downstream is not None:
+                for _ in range(self.stages[index + 1]['workers']):
+                    self._put(downstream, _DONE, force=True)
+
+        threads.append(threading.Thread(target=feed, name='stream-source', daemon=True))
+        for index, stage in enumerate(self.stages):
+            for n in range(stage['workers']):
+                threads.append(threading.Thread(target=work, args=(index,), name=f"stream-{stage['name']}-{n}", daemon=True))
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.stats['total'] = {'seconds': time.time() - started}
+        if self._errors:
+            raise self._errors[0]
+        return self.stats
+
+    def _add(self, name, kind, fn, workers, size=None):
+        self.stages.append({'name': name, 'kind': kind, 'fn': fn, 'workers': max(1, workers), 'size': size})
+        self.stats[name] = {'items_in': 0, 'items_out': 0, 'busy_seconds': 0.0}
+        return self
+
+    def _put(self, q, item, force=False):
+        # Poll so a failure elsewhere can unblock a producer stuck on a full queue
+        while True:
+            if self._stop.is_set() and not force:
+                raise _Stopped()
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    if force:
+                        return
+                    raise _Stopped()
+
+    def _get(self, q):
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def _fail(self, error):
+        with self._lock:
+            self._errors.append(error)
+        self._stop.set()
+
+    def _count(self, name, **increments):
+        with self._lock:
+            stats = self.stats.setdefault(name, {'items_in': 0, 'items_out': 0, 'busy_seconds': 0.0})
+            for key, value in increments.items():
+                stats[key] = stats.get(key, 0) + value
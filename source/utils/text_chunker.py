@@ -1,20 +1,86 @@
-import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
+from source.jira.adf import description_text
+
+class CharTokenEstimator:
+    """Fast token count estimate from character length.
+
+    ``chars_per_token`` defaults to 4, typical for English with BPE-style
+    tokenizers; ``calibrate`` fits it to a sample counted by the real
+    tokenizer. Any object with a ``count(text) -> float`` method can be
+    passed to TextChunker instead.
+    """
+
+    def __init__(self, chars_per_token: float = 4.0):
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> float:
+        return max(1.0, len(text.rstrip()) / self.chars_per_token)
+
+    def calibrate(self, texts: Iterable[str], token_counts: Iterable[int]) -> 'CharTokenEstimator':
+        """Fit chars_per_token to texts whose true token counts are known"""
+        chars = tokens = 0
+        for text, count in zip(texts, token_counts):
+            chars += len(text)
+            tokens += count
+        if tokens:
+            self.chars_per_token = chars / tokens
+        return self
+
+class Chunk:
+    """One chunk of a ticket; ``ticket`` is the metadata dict shared by all of
+    that ticket's chunks, not a copy."""
+
+    __slots__ = ('chunk_id', 'chunk_type', 'text', 'tokens', 'ticket')
+
+    def __init__(self, chunk_id: str, chunk_type: str, text: str, tokens: float, ticket: Dict[str, Any]):
+        self.chunk_id = chunk_id
+        self.chunk_type = chunk_type
+        self.text = text
+        self.tokens = tokens
+        self.ticket = ticket
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Flat dict in the original chunk_ticket shape"""
+        return {'text': self.text, 'chunk_type': self.chunk_type, 'chunk_id': self.chunk_id, **self.ticket}
+
+    def __repr__(self):
+        return f"Chunk({self.chunk_id!r}, {self.tokens:.0f} tokens)"
 
 class TextChunker:
-    def __init__(self, chunk_size=500, overlap=50):
-        self.chunk_size = chunk_size
-        self.overlap = overlap
-    
-    def chunk_ticket(self, ticket: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Token-aware ticket chunker.
+
+    Chunks are sized in model tokens, counted by ``tokenizer`` (a
+    CharTokenEstimator unless a real tokenizer is plugged in), and overlap by
+    about ``overlap_tokens``. Sizes include the ``Ticket: <title>`` header,
+    and a long title is truncated to fit, so no chunk exceeds ``max_tokens``
+    unless the fixed labels alone do. Chunks are yielded lazily as ``Chunk``
+    records that share one metadata dict per ticket.
+    """
+
+    def __init__(self, max_tokens: int = 128, overlap_tokens: int = 12, tokenizer=None):
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.tokenizer = tokenizer or CharTokenEstimator()
+
+    def chunk_ticket(self, ticket: Dict[str, Any]) -> List[Chunk]:
         """Chunk a Jira ticket into smaller pieces for better retrieval"""
-        
-        # Combine ticket text
+        return list(self.iter_chunks(ticket))
+
+    def iter_tickets(self, tickets: Iterable[Dict[str, Any]]) -> Iterator[Chunk]:
+        """Chunks for many tickets, lazily"""
+        for ticket in tickets:
+            yield from self.iter_chunks(ticket)
+
+    def iter_chunks(self, ticket: Dict[str, Any]) -> Iterator[Chunk]:
+        """Yield the title chunk, then the description chunks"""
         title = ticket.get('summary', '')
-        description = self._extract_description_text(ticket.get('description', ''))
-        
-        # Create base metadata
-        base_metadata = {
+        # Full ADF conversion, cached per issue key and updated stamp
+        description = description_text(ticket)
+
+        # Shared by every chunk of this ticket
+        metadata = {
             'key': ticket.get('key', ''),
             'status': ticket.get('status', ''),
             'priority': ticket.get('priority', ''),
@@ -23,95 +89,89 @@ class TextChunker:
             'created': ticket.get('created', ''),
             'updated': ticket.get('updated', '')
         }
-        
-        chunks = []
-        
-        # Chunk 1: Title + summary info (always include)
-        title_chunk = {
-            'text': f"Title: {title}\nStatus: {base_metadata['status']}\nPriority: {base_metadata['priority']}\nComponent: {base_metadata['component']}",
-            'chunk_type': 'title',
-            'chunk_id': f"{base_metadata['key']}_title",
-            **base_metadata
-        }
-        chunks.append(title_chunk)
-        
-        # Chunk 2+: Description chunks (if description exists)
-        if description and len(description.strip()) > 0:
-            desc_chunks = self._split_text(description)
-            
-            for i, chunk_text in enumerate(desc_chunks):
-                desc_chunk = {
-                    'text': f"Ticket: {title}\n\nDescription: {chunk_text}",
-                    'chunk_type': 'description',
-                    'chunk_id': f"{base_metadata['key']}_desc_{i}",
-                    **base_metadata
-                }
-                chunks.append(desc_chunk)
-        
-        return chunks
-    
-    def _extract_description_text(self, description) -> str:
-        """Extract plain text from description (handles both string and Atlassian Document Format)"""
-        if not description:
+        key = metadata['key']
+
+        details = (f"\nStatus: {metadata['status']}\nPriority: {metadata['priority']}"
+                   f"\nComponent: {metadata['component']}")
+        title_budget = max(0, self.max_tokens - self.tokenizer.count("Title: " + details))
+        title_text = "Title: " + self._truncate(title, title_budget) + details
+        yield Chunk(f"{key}_title", 'title', title_text, self.tokenizer.count(title_text), metadata)
+
+        if not description or not description.strip():
+            return
+
+        # The header repeats in every chunk, so it gets at most half the budget
+        frame = "Ticket: \n\nDescription: "
+        title_budget = max(0, self.max_tokens // 2 - self.tokenizer.count(frame))
+        header = f"Ticket: {self._truncate(title, title_budget)}\n\nDescription: "
+        # If the labels alone overrun a tiny max_tokens, the body still gets half
+        budget = max(self.max_tokens - self.tokenizer.count(header), self.max_tokens / 2)
+
+        for i, (body, _) in enumerate(self._split_text(description, budget)):
+            text = header + body
+            yield Chunk(f"{key}_desc_{i}", 'description', text, self.tokenizer.count(text), metadata)
+
+    def _truncate(self, text: str, budget: float) -> str:
+        """Leading part of text that fits in ``budget`` tokens, cut at a word boundary"""
+        text = text.strip()
+        if budget < 1:
             return ''
-        
-        # If it's already a string, return as-is
-        if isinstance(description, str):
-            return description
-        
-        # If it's Atlassian Document Format, extract text
-        if isinstance(description, dict) and description.get('type') == 'doc':
-            text_parts = []
-            content = description.get('content', [])
-            
-            for block in content:
-                if block.get('type') == 'paragraph':
-                    paragraph_content = block.get('content', [])
-                    for item in paragraph_content:
-                        if item.get('type') == 'text':
-                            text_parts.append(item.get('text', ''))
-            
-            return ' '.join(text_parts)
-        
-        # Fallback: convert to string
-        return str(description)
-    
-    def _split_text(self, text: str) -> List[str]:
-        """Split text into chunks with overlap"""
-        if len(text) <= self.chunk_size:
-            return [text]
-        
-        chunks = []
+        if not text or self.tokenizer.count(text) <= budget:
+            return text
+        return next(self._split_text(text, budget))[0]
+
+    def _split_text(self, text: str, budget: float) -> Iterator[tuple]:
+        """Yield (chunk_text, tokens) pieces of at most ``budget`` tokens.
+
+        The text's own chars-per-token ratio turns the token budget into a
+        character window. Each chunk ends at the last sentence end in the
+        second half of its window (else the last space), is re-counted once,
+        and shrinks only if the tokenizer disagrees with the estimate. Every
+        search is bounded by the current window, so the text is walked once
+        from front to back.
+        """
+        count = self.tokenizer.count
+        text = text.strip()
+        length = len(text)
+        total_tokens = count(text)
+        if total_tokens <= budget:
+            yield text, total_tokens
+            return
+
+        chars_per_token = length / total_tokens
+        window = max(int(budget * chars_per_token), 1)
+        overlap = int(self.overlap_tokens * chars_per_token)
         start = 0
-        
-        while start < len(text):
-            end = start + self.chunk_size
-            
-            # Try to break at sentence boundary
-            if end < len(text):
-                # Look for sentence endings
-                sentence_end = text.rfind('.', start, end)
-                if sentence_end == -1:
-                    sentence_end = text.rfind('!', start, end)
-                if sentence_end == -1:
-                    sentence_end = text.rfind('?', start, end)
-                
-                # If found sentence boundary, use it
-                if sentence_end > start + self.chunk_size // 2:
-                    end = sentence_end + 1
-                else:
-                    # Look for word boundary
-                    word_end = text.rfind(' ', start, end)
-                    if word_end > start + self.chunk_size // 2:
-                        end = word_end
-            
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
-            
-            # Move start position with overlap
-            start = end - self.overlap
-            if start >= len(text):
-                break
-        
-        return chunks
\ No newline at end of file
+
+        while start < length:
+            end = min(start + window, length)
+
+            while True:
+                if end < length:
+                    end = self._boundary(text, start, end)
+                piece = text[start:end].strip()
+                tokens = count(piece)
+                if tokens <= budget or end - start <= 1:
+                    break
+                # Estimate was optimistic for this stretch; shrink proportionally
+                end = start + max(int((end - start) * budget / tokens), 1)
+
+            if piece:
+                yield piece, tokens
+            if end >= length:
+                return
+
+            # Step back by the overlap, then forward to the next word start
+            next_start = text.find(' ', max(end - overlap, start + 1), end)
+            start = next_start + 1 if next_start != -1 else end
+
+    @staticmethod
+    def _boundary(text: str, start: int, end: int) -> int:
+        """Best cut position in text[start:end]: sentence end, else word end"""
+        half = start + (end - start) // 2
+        sentence_end = max(text.rfind('. ', half, end), text.rfind('! ', half, end), text.rfind('? ', half, end),
+                           text.rfind('\n', half, end))
+        if sentence_end != -1:
+            return sentence_end + 1
+        word_end = text.rfind(' ', half, end)
+        return word_end if word_end != -1 else end
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+import argparse
+import time
+import numpy as np
+from source.bedrock.embedding_engine import EmbeddingEngine
+from source.bedrock.embedding_profile import DEFAULT_PROFILE, MODEL_DIMENSIONS, EmbeddingProfile
+from source.vector_store.embedding_store import EmbeddingStore
+from source.vector_store.local_index import LocalVectorIndex
+from source.vector_store.ann_index import IVFIndex
+from source.vector_store.quantized_index import QuantizedIndex
+
+# Resident bytes per vector for each local precision
+BYTES_PER_VECTOR = {
+    'float32': lambda dimension: 4 * dimension,
+    'int8': lambda dimension: dimension,
+    'binary': lambda dimension: (dimension + 7) // 8
+}
+
+PRIORITIES = ('Critical', 'High', 'Medium', 'Low')
+
+def make_corpus(count, dimension, clusters=256, seed=0):
+    """Synthetic clustered embeddings that behave roughly like ticket chunks"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimension)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=count)
+    return centers[labels] + 0.35 * rng.normal(size=(count, dimension)).astype(np.float32)
+
+def recall_at_k(exact, approx):
+    """Fraction of exact top-k ids also returned by the approximate search"""
+    exact_ids = {r['id'] for r in exact}
+    return len(exact_ids & {r['id'] for r in approx}) / max(len(exact_ids), 1)
+
+def run_benchmark(count=100000, dimension=256, queries=200, top_k=10, nlist=1024,
+                  pq_subvectors=None, rerank=False, nprobes=(1, 4, 16, 64)):
+    """Compare IVF search against exact LocalVectorIndex search"""
+    print(f"📊 Building corpus: {count:,} vectors x {dimension} dims")
+    vectors = make_corpus(count, dimension)
+    keys = [str(i) for i in range(count)]
+    # Ticket-like metadata so filtered search runs as it does in the app
+    metadata = [{'priority': PRIORITIES[i % len(PRIORITIES)]} for i in range(count)]
+    query_vectors = make_corpus(queries, dimension, seed=1)
+
+    exact_index = LocalVectorIndex(keys, vectors, metadata)
+
+    start = time.time()
+    ann_index = IVFIndex.from_vectors(keys, vectors, metadata, nlist=nlist, pq_subvectors=pq_subvectors, rerank=rerank)
+    # The app precomputes bitmaps on whatever index it loads, before any search
+    ann_index.bitmaps.precompute()
+    print(f"✅ Trained IVF{'-PQ' if pq_subvectors else ''} index (nlist={ann_index.nlist}) in {time.time() - start:.1f}s")
+
+    start = time.time()
+    exact_results = [exact_index.search(q, top_k) for q in query_vectors]
+    exact_ms = (time.time() - start) / queries * 1000
+    print(f"🔍 Exact search: {exact_ms:.2f} ms/query")
+
+    for nprobe in nprobes:
+        start = time.time()
+        approx_results = [ann_index.search(q, top_k, nprobe=nprobe) for q in query_vectors]
+        approx_ms = (time.time() - start) / queries * 1000
+        recall = np.mean([recall_at_k(e, a) for e, a in zip(exact_results, approx_results)])
+        print(f"⚡ nprobe={nprobe:<4} recall@{top_k}={recall:.3f}  {approx_ms:.2f} ms/query")
+
+    filters = {'priority': PRIORITIES[0]}
+    nprobe = max(nprobes)
+    exact_results = [exact_index.search(q, top_k, filters) for q in query_vectors]
+    approx_results = [ann_index.search(q, top_k, filters, nprobe=nprobe) for q in query_vectors]
+    recall = np.mean([recall_at_k(e, a) for e, a in zip(exact_results, approx_results)])
+    print(f"⚡ nprobe={nprobe:<4} recall@{top_k}={recall:.3f}  filtered on priority={PRIORITIES[0]}")
+
+def run_precision_benchmark(corpora, top_k=10, precisions=('float32', 'int8', 'binary'), rerank=False,
+                            shared_reference=False):
+    """Memory and recall for each (dimension, precision) pair.
+
+    ``corpora`` maps dimension -> (vectors, query_vectors). Recall is measured
+    against exact float32 search at the same dimension, or, with
+    ``shared_reference`` (the same texts embedded at every dimension), against
+    the largest dimension, so the loss from dropping dimensions shows too.
+    """
+    references = {}
+    for dimension, (vectors, query_vectors) in corpora.items():
+        keys = [str(i) for i in range(len(vectors))]
+        references[dimension] = (keys, [LocalVectorIndex(keys, vectors).search(q, top_k) for q in query_vectors])
+    if shared_reference:
+        largest = references[max(corpora)]
+        references = {dimension: largest for dimension in corpora}
+
+    print(f"{'dims':>6} {'precision':>9} {'MB / 1M vectors':>16} {'recall@' + str(top_k):>10} {'loss':>7} {'ms/query':>9}")
+    for dimension, (vectors, query_vectors) in sorted(corpora.items()):
+        keys, reference = references[dimension]
+        for precision in precisions:
+            if precision == 'float32':
+                index = LocalVectorIndex(keys, vectors)
+            else:
+                index = QuantizedIndex(keys, vectors, precision=precision, rerank_vectors=vectors if rerank else None)
+
+            start = time.time()
+            results = [index.search(q, top_k) for q in query_vectors]
+            elapsed_ms = (time.time() - start) / len(query_vectors) * 1000
+            recall = np.mean([recall_at_k(e, a) for e, a in zip(reference, results)])
+            megabytes = BYTES_PER_VECTOR[precision](dimension) * 1_000_000 / 2 ** 20
+            print(f"{dimension:>6} {precision:>9} {megabytes:>16,.0f} {recall:>10.3f} {1 - recall:>7.3f} {elapsed_ms:>9.2f}")
+
+def synthetic_corpora(count, dimensions, queries):
+    """Independent synthetic corpora, one per dimension"""
+    return {
+        dimension: (make_corpus(count, dimension), make_corpus(queries, dimension, seed=1))
+        for dimension in dimensions
+    }
+
+def store_corpora(dimensions, sample, queries, model_id=None, seed=0):
+    """Re-embed a sample of the local store's texts at each dimension.
+
+    Documents are ticket texts and queries are ticket summaries, so every
+    dimension is compared on exactly the same inputs. Calls Bedrock.
+    """
+    store = EmbeddingStore.open()
+    if store is None:
+        raise SystemExit("No local embedding store - run the pipeline first")
+
+    rng = np.random.default_rng(seed)
+    texts = list(dict.fromkeys(store.metadata.column('text').tolist()))
+    texts = [texts[i] for i in rng.choice(len(texts), size=min(sample, len(texts)), replace=False)]
+    summaries = [text.split('\n', 1)[0] for text in texts[:queries]]
+
+    corpora = {}
+    for dimension in dimensions:
+        profile = EmbeddingProfile(model_id or DEFAULT_PROFILE.model_id, dimension, DEFAULT_PROFILE.normalize)
+        engine = EmbeddingEngine(profile=profile)
+        print(f"📊 Embedding {len(texts)} texts at {dimension} dims")
+        corpora[dimension] = (
+            np.asarray(engine.embed_many(texts), dtype=np.float32),
+            np.asarray(engine.embed_many(summaries), dtype=np.float32)
+        )
+    return corpora
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local ANN search against exact search")
+    parser.add_argument('--vectors', type=int, default=100000)
+    parser.add_argument('--dimension', type=int, default=256)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--nlist', type=int, default=1024)
+    parser.add_argument('--pq-subvectors', type=int, default=None)
+    parser.add_argument('--rerank', action='store_true', help="rescore PQ candidates with exact vectors")
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--precision', nargs='+', choices=sorted(BYTES_PER_VECTOR),
+                        help="compare local precisions (float32/int8/binary) instead of IVF settings")
+    parser.add_argument('--dimensions', type=int, nargs='+',
+                        help="embedding dimensions to compare (default: --dimension)")
+    parser.add_argument('--from-store', type=int, metavar='SAMPLE',
+                        help="re-embed SAMPLE texts from the local store at each dimension via Bedrock")
+    args = parser.parse_args()
+
+    if args.precision:
+        dimensions = args.dimensions or [args.dimension]
+        if args.from_store:
+            supported = MODEL_DIMENSIONS.get(DEFAULT_PROFILE.model_id, dimensions)
+            corpora = store_corpora([d for d in dimensions if d in supported], args.from_store, args.queries)
+        else:
+            print(f"📊 Synthetic corpora: {args.vectors:,} vectors per dimension")
+            corpora = synthetic_corpora(args.vectors, dimensions, args.queries)
+        run_precision_benchmark(
+            corpora,
+            top_k=args.top_k,
+            precisions=args.precision,
+            rerank=args.rerank,
+            shared_reference=bool(args.from_store)
+        )
+        return
+
+    run_benchmark(
+        count=args.vectors,
+        dimension=args.dimension,
+        queries=args.queries,
+        top_k=args.top_k,
+        nlist=args.nlist,
+        pq_subvectors=args.pq_subvectors,
+        rerank=args.rerank,
+        nprobes=args.nprobe
+    )
+
+if __name__ == "__main__":
+    main()
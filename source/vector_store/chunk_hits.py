@@ -0,0 +1,42 @@
+import re
+from typing import List, Dict, Any
+
+# Chunk vectors are keyed {ticket}_title and {ticket}_desc_{i}
+CHUNK_KEY_PATTERN = re.compile(r'_(?:title|desc_\d+)$')
+
+AGGREGATIONS = ('max', 'sum')
+
+def ticket_key(vector_key: str) -> str:
+    """Ticket key a vector belongs to (the key itself for ticket-level vectors)"""
+    return CHUNK_KEY_PATTERN.sub('', vector_key)
+
+def is_chunk_key(vector_key: str) -> bool:
+    return CHUNK_KEY_PATTERN.search(vector_key) is not None
+
+def collapse_chunk_hits(matches: List[Dict[str, Any]], aggregate: str = 'max',
+                        top_k: int = 10) -> List[Dict[str, Any]]:
+    """Collapse ``{'id', 'score', 'metadata'}`` chunk matches into ticket matches.
+
+    ``max`` scores a ticket by its best chunk; ``sum`` adds up every matched
+    chunk, favouring tickets that match in several places. Each ticket keeps
+    its best chunk's metadata, with ``id`` set to the ticket key and
+    ``best_chunk`` / ``chunks`` recording where and how often it matched.
+    Ticket-level matches pass through unchanged apart from those fields.
+    """
+    if aggregate not in AGGREGATIONS:
+        raise ValueError(f"aggregate must be one of {AGGREGATIONS}")
+
+    tickets = {}
+    for match in matches:
+        key = ticket_key(match['id'])
+        hit = tickets.get(key)
+        if hit is None:
+            tickets[key] = dict(match, id=key, best_chunk=match['id'], chunks=1)
+            continue
+        hit['chunks'] += 1
+        if aggregate == 'sum':
+            hit['score'] += match['score']
+        elif match['score'] > hit['score']:
+            hit.update(score=match['score'], metadata=match['metadata'], best_chunk=match['id'])
+
+    return sorted(tickets.values(), key=lambda hit: hit['score'], reverse=True)[:top_k]
@@ -0,0 +1,259 @@
+import json
+import os
+import shutil
+import numpy as np
+from typing import List, Dict, Any, Iterable, Optional
+
+STORE_FORMAT = 'financeinsights-embeddings'
+STORE_VERSION = 1
+DEFAULT_STORE_PATH = os.getenv('EMBEDDING_STORE_PATH', '.cache/embedding_store')
+
+class EmbeddingStoreWriter:
+    """Write a memory-mappable embedding store one batch at a time.
+
+    Layout of the store directory::
+
+        header.json              format, count, dimension, dtype, model profile
+        vectors.npy              (count, dimension) float32 or float16 matrix
+        keys.npy                 fixed-width unicode key array, row-aligned
+        metadata/<col>.codes.npy int32 dictionary codes per row
+        metadata/<col>.values.npy distinct values for the column
+
+    Vectors are streamed to disk as they are appended; only keys and
+    metadata columns are held in memory until ``close``.
+    """
+
+    def __init__(self, path: str, dimension: int, dtype: str = 'float32',
+                 model_id: str = '', normalized: bool = True):
+        if dtype not in ('float32', 'float16'):
+            raise ValueError("dtype must be float32 or float16")
+        self.path = path
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+        self.model_id = model_id
+        self.normalized = normalized
+
+        self._staging = path + '.tmp'
+        shutil.rmtree(self._staging, ignore_errors=True)
+        os.makedirs(os.path.join(self._staging, 'metadata'))
+        self._raw = open(os.path.join(self._staging, 'vectors.raw'), 'wb')
+        self._keys = []
+        self._columns = {}
+
+    def append(self, keys: List[str], vectors, metadata: List[Dict[str, Any]] = None):
+        """Append a batch of rows"""
+        vectors = np.asarray(vectors, dtype=self.dtype).reshape(len(keys), self.dimension)
+        self._raw.write(np.ascontiguousarray(vectors).tobytes())
+
+        start = len(self._keys)
+        self._keys.extend(keys)
+        for offset, row in enumerate(metadata or [{} for _ in keys]):
+            for column, value in row.items():
+                values = self._columns.setdefault(column, [])
+                values.extend([''] * (start + offset - len(values)))
+                values.append('' if value is None else str(value))
+        # Pad columns missing from this batch
+        for values in self._columns.values():
+            values.extend([''] * (len(self._keys) - len(values)))
+
+    def close(self):
+        """Finalize the .npy files and atomically publish the store"""
+        self._raw.close()
+        raw_path = os.path.join(self._staging, 'vectors.raw')
+
+        with open(os.path.join(self._staging, 'vectors.npy'), 'wb') as out:
+            np.lib.format.write_array_header_1_0(out, {
+                'descr': np.lib.format.dtype_to_descr(self.dtype),
+                'fortran_order': False,
+                'shape': (len(self._keys), self.dimension)
+            })
+            with open(raw_path, 'rb') as raw:
+                shutil.copyfileobj(raw, out, 16 * 1024 * 1024)
+        os.remove(raw_path)
+
+        np.save(os.path.join(self._staging, 'keys.npy'), np.array(self._keys, dtype=str))
+
+        _save_columns(os.path.join(self._staging, 'metadata'), self._columns)
+
+        with open(os.path.join(self._staging, 'header.json'), 'w') as f:
+            json.dump({
+                'format': STORE_FORMAT,
+                'version': STORE_VERSION,
+                'count': len(self._keys),
+                'dimension': self.dimension,
+                'dtype': self.dtype.name,
+                'model_id': self.model_id,
+                'normalized': self.normalized,
+                'metadata_columns': sorted(self._columns)
+            }, f, indent=2)
+
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.replace(self._staging, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._raw.close()
+            shutil.rmtree(self._staging, ignore_errors=True)
+
+def write_embedding_store(path: str, keys: List[str], vectors, metadata: List[Dict[str, Any]] = None,
+                          dtype: str = 'float32', model_id: str = '', normalized: bool = True):
+    """Write a complete store in one call.
+
+    Without rows there is no dimension to record, so any existing store is
+    removed instead of publishing an empty one.
+    """
+    if not len(keys):
+        shutil.rmtree(path, ignore_errors=True)
+        return
+    vectors = np.asarray(vectors)
+    dimension = vectors.shape[1] if vectors.ndim == 2 else 0
+    with EmbeddingStoreWriter(path, dimension, dtype, model_id, normalized) as writer:
+        writer.append(keys, vectors, metadata)
+
+def update_store_metadata(path: str, metadata: Iterable[Dict[str, Any]]):
+    """Replace a store's metadata columns, leaving vectors and keys untouched.
+
+    ``metadata`` holds one row dict per stored row, in row order. The new
+    columns are written beside the old ones and swapped in, so readers that
+    already have the old columns mapped keep working.
+    """
+    with open(os.path.join(path, 'header.json'), 'r') as f:
+        header = json.load(f)
+
+    columns = {}
+    rows = 0
+    for row in metadata:
+        for column, value in row.items():
+            values = columns.setdefault(column, [])
+            values.extend([''] * (rows - len(values)))
+            values.append('' if value is None else str(value))
+        rows += 1
+    if rows != header['count']:
+        raise ValueError(f"expected {header['count']} metadata rows, got {rows}")
+    for values in columns.values():
+        values.extend([''] * (rows - len(values)))
+
+    staging = os.path.join(path, 'metadata.tmp')
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    _save_columns(staging, columns)
+
+    previous = os.path.join(path, 'metadata.old')
+    shutil.rmtree(previous, ignore_errors=True)
+    os.replace(os.path.join(path, 'metadata'), previous)
+    os.replace(staging, os.path.join(path, 'metadata'))
+
+    header['metadata_columns'] = sorted(columns)
+    with open(os.path.join(path, 'header.json.tmp'), 'w') as f:
+        json.dump(header, f, indent=2)
+    os.replace(os.path.join(path, 'header.json.tmp'), os.path.join(path, 'header.json'))
+    shutil.rmtree(previous, ignore_errors=True)
+
+def upsert_embedding_store(path: str, keys: List[str], vectors, metadata: List[Dict[str, Any]] = None,
+                           drop_keys: Iterable[str] = (), batch_size: int = 4096, **kwargs):
+    """Add rows to a store, replacing rows with the same keys and removing
+    rows keyed by ``drop_keys``.
+
+    The existing rows are copied batch by batch into a new store that is
+    published like any other write. Without an existing store, ``kwargs``
+    (dtype, model_id, normalized) describe the new one. An empty store
+    (e.g. from a run whose embeddings all failed) counts as no store.
+    """
+    store = EmbeddingStore.open(path)
+    vectors = np.asarray(vectors)
+    if store is None or not len(store) or not store.dimension:
+        write_embedding_store(path, keys, vectors, metadata, **kwargs)
+        return
+
+    header = store.header
+    if len(keys) and vectors.shape[1] != store.dimension:
+        raise ValueError(f"store holds {store.dimension}-dimensional vectors, got {vectors.shape[1]}")
+
+    replaced = set(keys) | set(drop_keys)
+    with EmbeddingStoreWriter(path, store.dimension, header['dtype'],
+                              header.get('model_id', ''), header.get('normalized', True)) as writer:
+        for start in range(0, len(store), batch_size):
+            rows = [row for row in range(start, min(start + batch_size, len(store)))
+                    if str(store.keys[row]) not in replaced]
+            if rows:
+                writer.append([str(store.keys[row]) for row in rows], store.vectors[rows],
+                              [store.metadata[row] for row in rows])
+        writer.append(list(keys), vectors, metadata)
+
+def _save_columns(directory: str, columns: Dict[str, List[str]]):
+    """Dictionary-encode each column into <col>.values.npy and <col>.codes.npy"""
+    for column, values in columns.items():
+        distinct, codes = np.unique(np.array(values, dtype=str), return_inverse=True)
+        np.save(os.path.join(directory, f'{column}.values.npy'), distinct)
+        np.save(os.path.join(directory, f'{column}.codes.npy'), codes.astype(np.int32))
+
+class EmbeddingStore:
+    """Read-only, memory-mapped view of a store written by EmbeddingStoreWriter.
+
+    Opening is O(1) in corpus size: vectors, keys and metadata codes are
+    ``numpy.memmap`` views, so pages are read on demand and shared between
+    processes through the OS page cache.
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, 'header.json'), 'r') as f:
+            self.header = json.load(f)
+        if self.header.get('format') != STORE_FORMAT:
+            raise ValueError(f"{path} is not an embedding store")
+
+        self.path = path
+        self.vectors = np.load(os.path.join(path, 'vectors.npy'), mmap_mode='r')
+        self.keys = np.load(os.path.join(path, 'keys.npy'), mmap_mode='r')
+        self.metadata = MetadataColumns(path, self.header['metadata_columns'], len(self.keys))
+
+    @classmethod
+    def open(cls, path: str = DEFAULT_STORE_PATH) -> Optional['EmbeddingStore']:
+        """Open a store, or return None if none has been written"""
+        if not os.path.exists(os.path.join(path, 'header.json')):
+            return None
+        return cls(path)
+
+    def __len__(self):
+        return self.header['count']
+
+    @property
+    def dimension(self) -> int:
+        return self.header['dimension']
+
+    @property
+    def model_id(self) -> str:
+        return self.header.get('model_id', '')
+
+class MetadataColumns:
+    """Columnar metadata sidecar that also behaves like a list of row dicts"""
+
+    def __init__(self, path: str, columns: Iterable[str], count: int):
+        self.count = count
+        self.codes = {}
+        self.values = {}
+        for column in columns:
+            base = os.path.join(path, 'metadata', column)
+            self.codes[column] = np.load(f'{base}.codes.npy', mmap_mode='r')
+            self.values[column] = np.load(f'{base}.values.npy')
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, row: int) -> Dict[str, str]:
+        return {
+            column: str(self.values[column][codes[row]])
+            for column, codes in self.codes.items()
+        }
+
+    def __iter__(self):
+        for row in range(self.count):
+            yield self[row]
+
+    def column(self, name: str) -> np.ndarray:
+        """Decoded values for one column (materializes the column)"""
+        return self.values[name][self.codes[name]]
@@ -0,0 +1,139 @@
+import math
+import re
+import numpy as np
+from collections import Counter
+from typing import List, Dict, Any, Iterable
+from source.vector_store.metadata_filter import FilterBitmaps
+
+# Keeps identifiers whole: ERR_1234, KAN-42, v2.1
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+(?:[_\-.][a-z0-9]+)*')
+
+# Ticket keys are indexed too so a query naming one finds it directly
+DEFAULT_FIELD_WEIGHTS = {'id': 3.0, 'summary': 2.0, 'text': 1.0, 'component': 1.5}
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word and identifier tokens"""
+    return TOKEN_PATTERN.findall(str(text or '').lower())
+
+class BM25Index:
+    """In-memory inverted index with BM25 scoring.
+
+    Each record's fields are tokenized and their term frequencies scaled by
+    ``field_weights`` (a simplified BM25F), so a hit in the summary counts
+    for more than one in the body. Records can be added incrementally;
+    re-adding a key replaces the earlier version. ``search`` returns the
+    same ``{'id', 'score', 'metadata'}`` dicts as the vector indexes.
+    """
+
+    def __init__(self, field_weights: Dict[str, float] = None, k1: float = 1.2, b: float = 0.75):
+        self.field_weights = field_weights or DEFAULT_FIELD_WEIGHTS
+        self.k1 = k1
+        self.b = b
+        self.keys = []
+        self.metadata = []
+        self._rows = {}
+        self._postings = {}
+        self._doc_terms = []
+        self._lengths = []
+        self._total_length = 0.0
+        self._live = 0
+        self._bitmaps = None
+
+    def __len__(self):
+        return self._live
+
+    @property
+    def bitmaps(self) -> FilterBitmaps:
+        """Filter bitmaps over the current records (rebuilt after ``add``)"""
+        if self._bitmaps is None:
+            self._bitmaps = FilterBitmaps(self.metadata)
+        return self._bitmaps
+
+    def add(self, records: Iterable[Dict[str, Any]], key_field: str = 'id'):
+        """Index records; a key seen before is replaced"""
+        self._bitmaps = None
+        for record in records:
+            key = record[key_field]
+            terms = Counter()
+            for field, weight in self.field_weights.items():
+                for token in tokenize(record.get(field, '')):
+                    terms[token] += weight
+            length = sum(terms.values())
+
+            row = self._rows.get(key)
+            if row is None:
+                row = len(self.keys)
+                self._rows[key] = row
+                self.keys.append(key)
+                self.metadata.append(record)
+                self._doc_terms.append(terms)
+                self._lengths.append(length)
+                self._live += 1
+            else:
+                for term in self._doc_terms[row]:
+                    del self._postings[term][row]
+                self._total_length -= self._lengths[row]
+                self.metadata[row] = record
+                self._doc_terms[row] = terms
+                self._lengths[row] = length
+
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, {})[row] = frequency
+            self._total_length += length
+
+    def search(self, query: str, top_k: int = 10, filters: Dict = None) -> List[Dict[str, Any]]:
+        """Top-k records by BM25 score for a free-text query, optionally
+        restricted to rows matching a metadata filter spec"""
+        if not self._live:
+            return []
+
+        lengths = np.asarray(self._lengths, dtype=np.float32)
+        average = self._total_length / self._live or 1.0
+        norms = self.k1 * (1 - self.b + self.b * lengths / average)
+        scores = np.zeros(len(self.keys), dtype=np.float32)
+
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            rows = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+            frequencies = np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+            idf = math.log(1 + (self._live - len(postings) + 0.5) / (len(postings) + 0.5))
+            scores[rows] += idf * frequencies * (self.k1 + 1) / (frequencies + norms[rows])
+
+        if filters:
+            scores[~self.bitmaps.mask(filters)] = 0
+
+        matched = np.flatnonzero(scores)
+        if matched.size == 0:
+            return []
+        if matched.size > top_k:
+            matched = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+        matched = matched[np.argsort(-scores[matched])]
+
+        return [
+            {'id': self.keys[row], 'score': float(scores[row]), 'metadata': self.metadata[row]}
+            for row in matched
+        ]
+
+def reciprocal_rank_fusion(rankings: Dict[str, List[Dict[str, Any]]], weights: Dict[str, float] = None,
+                           k: int = 60, top_k: int = 10, key=lambda result: result['id']) -> List[Dict[str, Any]]:
+    """Fuse ranked result lists with weighted reciprocal-rank fusion.
+
+    Each result earns ``weight / (k + rank)`` from every list it appears in.
+    Returns the first-seen result dict per key with ``fused_score`` and the
+    ``ranks`` it held in each list added.
+    """
+    weights = weights or {}
+    fused = {}
+
+    for name, results in rankings.items():
+        weight = weights.get(name, 1.0)
+        for rank, result in enumerate(results, start=1):
+            result_key = key(result)
+            if result_key not in fused:
+                fused[result_key] = dict(result, fused_score=0.0, ranks={})
+            fused[result_key]['fused_score'] += weight / (k + rank)
+            fused[result_key]['ranks'][name] = rank
+
+    return sorted(fused.values(), key=lambda result: result['fused_score'], reverse=True)[:top_k]
@@ -0,0 +1,97 @@
+import numpy as np
+from typing import List, Dict, Any, Iterable
+from source.vector_store.metadata_filter import FilterBitmaps
+
+class LocalVectorIndex:
+    """Exact in-process cosine search over a contiguous float32 matrix.
+
+    Rows are L2-normalized once at build time, so a query is a single
+    matrix-vector product followed by ``argpartition`` for the top k.
+    ``search`` mirrors ``S3VectorsNative.search_similar``.
+    """
+
+    def __init__(self, keys: List[str], embeddings, metadata: List[Dict[str, Any]] = None,
+                 normalized: bool = False):
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or len(matrix) != len(keys):
+            raise ValueError("embeddings must be a (len(keys), dimension) matrix")
+
+        if normalized:
+            # Already unit length (e.g. a float32 memmap) - use it without copying
+            self.matrix = matrix
+        else:
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self.matrix = matrix / norms
+        self.keys = list(keys)
+        self.metadata = metadata if metadata is not None else [{} for _ in self.keys]
+        self.bitmaps = FilterBitmaps(self.metadata)
+
+    @classmethod
+    def build(cls, records: Iterable[Dict[str, Any]], embedding_engine,
+              key_field: str = 'id', text_field: str = 'text') -> 'LocalVectorIndex':
+        """Embed records through an EmbeddingEngine and index them"""
+        records = list(records)
+        return cls(
+            [record[key_field] for record in records],
+            embed_records(records, embedding_engine, text_field),
+            records
+        )
+
+    @classmethod
+    def from_store(cls, store) -> 'LocalVectorIndex':
+        """Index a memory-mapped EmbeddingStore (zero-copy for normalized float32)"""
+        return cls(
+            store.keys.tolist(),
+            store.vectors,
+            store.metadata,
+            normalized=store.header.get('normalized', False)
+        )
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    def search(self, query_embedding: List[float], top_k: int = 10, filters: Dict = None) -> List[Dict[str, Any]]:
+        """Return the top_k most similar rows as {'id', 'score', 'metadata'} dicts.
+
+        ``filters`` is a metadata filter spec (see ``metadata_filter``); it is
+        evaluated with precomputed bitmaps and only matching rows are scored.
+        """
+        if not self.keys:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        if filters:
+            rows = np.flatnonzero(self.bitmaps.mask(filters))
+            scores = self.matrix[rows] @ query
+        else:
+            rows = None
+            scores = self.matrix @ query
+
+        top_k = min(top_k, len(scores))
+        if top_k == 0:
+            return []
+        if top_k < len(scores):
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(len(scores))
+        ranked = candidates[np.argsort(-scores[candidates])]
+
+        return [
+            {'id': self.keys[row], 'score': float(scores[i]), 'metadata': self.metadata[row]}
+            for i, row in ((i, i if rows is None else rows[i]) for i in ranked)
+        ]
+
+def embed_records(records: List[Dict[str, Any]], embedding_engine, text_field: str = 'text') -> np.ndarray:
+    """Embed records through an EmbeddingEngine into a float32 matrix"""
+    embeddings = embedding_engine.embed_many(record[text_field] for record in records)
+    dimension = len(embeddings[0]) if embeddings else 0
+    return np.asarray(embeddings, dtype=np.float32).reshape(len(records), dimension)
@@ -0,0 +1,201 @@
+import re
+import time
+import numpy as np
+from typing import List, Dict, Any, Optional
+from source.jira.sync_state import parse_jira_timestamp
+
+# Filter spec shared by the app, S3 Vectors pushdown and local indexes:
+#   {'priority': [...], 'status': [...], 'component': [...],   any categorical field
+#    'min_urgency': 7, 'created_after': epoch_seconds, 'created_before': epoch_seconds}
+
+# Values can hold several comma-separated entries (e.g. "Payments, Auth")
+MULTI_VALUE_FIELDS = ('component',)
+
+DAY_SECONDS = 86400
+
+def created_epoch(value) -> float:
+    """Epoch seconds for a Jira timestamp (or number); NaN if unknown"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        stamp = parse_jira_timestamp(value)
+    except ValueError:
+        return float('nan')
+    return stamp.timestamp() if stamp else float('nan')
+
+def describe_filters(filters: Dict[str, Any]) -> str:
+    """Short human-readable summary of a filter spec"""
+    parts = []
+    for field, value in filters.items():
+        if field == 'min_urgency':
+            parts.append(f"urgency ≥ {value}")
+        elif field == 'created_after':
+            parts.append(f"created after {time.strftime('%Y-%m-%d', time.localtime(value))}")
+        elif field == 'created_before':
+            parts.append(f"created before {time.strftime('%Y-%m-%d', time.localtime(value))}")
+        else:
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            parts.append(f"{field}: {', '.join(str(v) for v in values)}")
+    return '; '.join(parts)
+
+def to_s3_filter(filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Translate a filter spec into an S3 Vectors ``metadataFilters`` document.
+
+    Relies on the vector metadata written by the pipeline: ``component`` is a
+    list, ``urgency_score`` a number and ``created_at`` epoch seconds.
+    """
+    clauses = []
+    for field, value in filters.items():
+        if field == 'min_urgency':
+            clauses.append({'urgency_score': {'$gte': value}})
+        elif field == 'created_after':
+            clauses.append({'created_at': {'$gte': int(value)}})
+        elif field == 'created_before':
+            clauses.append({'created_at': {'$lt': int(value)}})
+        else:
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            clauses.append({field: {'$in': values}})
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {'$and': clauses}
+
+def parse_question_filters(question: str, components: List[str] = (), now: float = None) -> Dict[str, Any]:
+    """Infer filters from phrases in a question.
+
+    Deliberately conservative: "critical systems" is not a priority filter,
+    but "critical tickets" and "high priority" are.
+    """
+    text = question.lower()
+    now = now if now is not None else time.time()
+    filters = {}
+
+    priorities = re.findall(r'\b(critical|highest|high|medium|low|lowest)[- ]priority\b', text)
+    priorities += re.findall(r'\b(critical|blocker)\s+(?:tickets|issues|incidents|bugs)\b', text)
+    priorities += re.findall(r'\bpriority\s+(?:is\s+)?(critical|highest|high|medium|low|lowest)\b', text)
+    if priorities:
+        filters['priority'] = sorted({p.title() for p in priorities})
+
+    statuses = re.findall(r'\b(open|in progress|to do|resolved|closed|done)\s+(?:tickets|issues|incidents|bugs)\b', text)
+    statuses += re.findall(r'\bstatus\s+(?:is\s+)?(open|in progress|to do|resolved|closed|done)\b', text)
+    if statuses:
+        filters['status'] = sorted({s.title() for s in statuses})
+
+    mentioned = [c for c in components if c and re.search(rf'\b{re.escape(c.lower())}\b', text)]
+    if mentioned:
+        filters['component'] = sorted(set(mentioned))
+
+    if re.search(r'\b(?:high[- ]urgency|most urgent|urgent)\b', text):
+        filters['min_urgency'] = 7
+    match = re.search(r'\burgency(?:\s+score)?\s*(?:>=|≥|of at least|at least|above)\s*(\d+)', text)
+    if match:
+        filters['min_urgency'] = int(match.group(1))
+
+    if re.search(r'\btoday\b', text):
+        filters['created_after'] = now - DAY_SECONDS
+    elif re.search(r'\byesterday\b', text):
+        filters['created_after'] = now - 2 * DAY_SECONDS
+    elif re.search(r'\bthis week\b|\bpast week\b|\blast 7 days\b', text):
+        filters['created_after'] = now - 7 * DAY_SECONDS
+    elif re.search(r'\bthis month\b|\bpast month\b|\blast 30 days\b', text):
+        filters['created_after'] = now - 30 * DAY_SECONDS
+    else:
+        match = re.search(r'\b(?:last|past)\s+(\d+)\s+(day|week|month)s?\b', text)
+        if match:
+            unit = {'day': 1, 'week': 7, 'month': 30}[match.group(2)]
+            filters['created_after'] = now - int(match.group(1)) * unit * DAY_SECONDS
+
+    return filters
+
+class FilterBitmaps:
+    """Precomputed boolean row masks for evaluating filter specs locally.
+
+    For each categorical field a ``{value: bool array}`` map is built the first
+    time the field is filtered on and reused afterwards; ranges use cached
+    numeric columns. A filter spec then reduces to a few vectorized ANDs/ORs,
+    evaluated before any vector is scored. ``metadata`` may be a list of row
+    dicts or an EmbeddingStore ``MetadataColumns`` (built from its codes).
+    """
+
+    def __init__(self, metadata):
+        self.metadata = metadata
+        self.count = len(metadata)
+        self._bitmaps = {}
+        self._numeric = {}
+
+    def precompute(self, fields: List[str] = ('priority', 'status', 'component')) -> 'FilterBitmaps':
+        """Build bitmaps and range columns up front, e.g. when a corpus loads"""
+        for field in fields:
+            self._field(field)
+        self._column('urgency_score', float)
+        self._column('created', created_epoch)
+        return self
+
+    def values(self, field: str) -> List[str]:
+        """Distinct values seen for a categorical field"""
+        return sorted(self._field(field))
+
+    def mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Rows matching every clause of a filter spec"""
+        mask = np.ones(self.count, dtype=bool)
+        for field, value in filters.items():
+            if field == 'min_urgency':
+                mask &= self._column('urgency_score', float) >= value
+            elif field == 'created_after':
+                mask &= self._column('created', created_epoch) >= value
+            elif field == 'created_before':
+                mask &= self._column('created', created_epoch) < value
+            else:
+                bitmaps = self._field(field)
+                values = value if isinstance(value, (list, tuple, set)) else [value]
+                allowed = np.zeros(self.count, dtype=bool)
+                for v in values:
+                    if v in bitmaps:
+                        allowed |= bitmaps[v]
+                mask &= allowed
+        return mask
+
+    def _field(self, field: str) -> Dict[str, np.ndarray]:
+        if field in self._bitmaps:
+            return self._bitmaps[field]
+
+        codes = getattr(self.metadata, 'codes', {}).get(field)
+        if codes is not None:
+            # Dictionary-encoded column: one comparison per distinct value
+            rows_per_value = {
+                str(value): np.asarray(codes) == code
+                for code, value in enumerate(self.metadata.values[field])
+            }
+        else:
+            column = [str(row.get(field, '')) for row in self.metadata]
+            distinct, inverse = np.unique(np.array(column, dtype=str), return_inverse=True)
+            rows_per_value = {str(value): inverse == code for code, value in enumerate(distinct)}
+
+        bitmaps = {}
+        for value, rows in rows_per_value.items():
+            parts = value.split(', ') if field in MULTI_VALUE_FIELDS else [value]
+            for part in parts:
+                if part:
+                    bitmaps[part] = bitmaps[part] | rows if part in bitmaps else rows
+        self._bitmaps[field] = bitmaps
+        return bitmaps
+
+    def _column(self, field: str, convert) -> np.ndarray:
+        if field in self._numeric:
+            return self._numeric[field]
+
+        def number(value):
+            try:
+                return convert(value)
+            except (TypeError, ValueError):
+                return float('nan')
+
+        codes = getattr(self.metadata, 'codes', {}).get(field)
+        if codes is not None:
+            # Convert each distinct value once, then expand through the codes
+            distinct = np.array([number(value) for value in self.metadata.values[field]], dtype=np.float64)
+            column = distinct[np.asarray(codes)] if len(distinct) else np.full(self.count, np.nan)
+        else:
+            column = np.fromiter((number(row.get(field)) for row in self.metadata), dtype=np.float64, count=self.count)
+        self._numeric[field] = column
+        return column
@@ -0,0 +1,134 @@
+import numpy as np
+from typing import List, Dict, Any, Optional
+from source.vector_store.metadata_filter import FilterBitmaps
+
+PRECISIONS = ('int8', 'binary')
+
+# Candidates rescored per result: binary codes rank far more coarsely than int8
+DEFAULT_RERANK_FACTORS = {'int8': 4, 'binary': 10}
+
+# Set bits in each byte value, for Hamming distances on NumPy < 2.0 (no bitwise_count)
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+class QuantizedIndex:
+    """Exact-scan cosine search over int8 or binary codes.
+
+    ``int8`` stores each dimension as a signed byte with a per-dimension
+    scale (4x smaller than float32) and scores a query as
+    ``codes @ (query * scales)``. ``binary`` keeps only the sign of each
+    dimension, packed eight to a byte (32x smaller), and scores by Hamming
+    distance. When ``rerank_vectors`` is given (typically the memory-mapped
+    float32 matrix of an EmbeddingStore, so only the rows read are paged in),
+    the best ``top_k * rerank_factor`` candidates are rescored exactly.
+
+    ``search`` mirrors ``LocalVectorIndex.search``.
+    """
+
+    def __init__(self, keys: List[str], vectors, metadata: List[Dict[str, Any]] = None,
+                 precision: str = 'int8', rerank_vectors=None, rerank_factor: Optional[int] = None,
+                 batch_size: int = 4096):
+        if precision not in PRECISIONS:
+            raise ValueError(f"precision must be one of {PRECISIONS}")
+        if len(vectors) != len(keys):
+            raise ValueError("vectors must have one row per key")
+
+        self.precision = precision
+        self.keys = list(keys)
+        self.metadata = metadata if metadata is not None else [{} for _ in self.keys]
+        self.rerank_vectors = rerank_vectors
+        self.rerank_factor = rerank_factor or DEFAULT_RERANK_FACTORS[precision]
+        self.batch_size = batch_size
+        self.dimension = vectors.shape[1] if len(vectors) else 0
+        self.bitmaps = FilterBitmaps(self.metadata)
+
+        # Encoded batch by batch so a memory-mapped matrix is never copied whole
+        batches = range(0, len(vectors), batch_size)
+        if precision == 'int8':
+            peak = np.zeros(self.dimension, dtype=np.float32)
+            for start in batches:
+                peak = np.maximum(peak, np.abs(_normalize(vectors[start:start + batch_size])).max(axis=0))
+            self.scales = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+            self.codes = np.empty((len(vectors), self.dimension), dtype=np.int8)
+            for start in batches:
+                batch = _normalize(vectors[start:start + batch_size]) / self.scales
+                self.codes[start:start + batch_size] = np.clip(np.rint(batch), -127, 127)
+        else:
+            self.scales = None
+            self.codes = np.empty((len(vectors), (self.dimension + 7) // 8), dtype=np.uint8)
+            for start in batches:
+                self.codes[start:start + batch_size] = np.packbits(vectors[start:start + batch_size] > 0, axis=1)
+
+    @classmethod
+    def from_store(cls, store, precision: str = 'int8', rerank: bool = True, **kwargs) -> 'QuantizedIndex':
+        """Quantize an EmbeddingStore, reranking against its memory-mapped vectors"""
+        return cls(
+            store.keys.tolist(),
+            store.vectors,
+            store.metadata,
+            precision=precision,
+            rerank_vectors=store.vectors if rerank else None,
+            **kwargs
+        )
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def nbytes(self) -> int:
+        """Resident size of the codes (the rerank matrix stays on disk)"""
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def search(self, query_embedding: List[float], top_k: int = 10, filters: Dict = None) -> List[Dict[str, Any]]:
+        """Return the top_k most similar rows as {'id', 'score', 'metadata'} dicts"""
+        if not self.keys:
+            return []
+
+        query = _normalize(np.asarray(query_embedding, dtype=np.float32)[None, :])[0]
+        if filters:
+            rows = np.flatnonzero(self.bitmaps.mask(filters))
+            if len(rows) == 0:
+                return []
+            selections = (rows[start:start + self.batch_size] for start in range(0, len(rows), self.batch_size))
+        else:
+            # Slices instead of row arrays: no gather copy of the codes
+            rows = np.arange(len(self.keys))
+            selections = (slice(start, start + self.batch_size) for start in range(0, len(rows), self.batch_size))
+
+        scores = np.concatenate([self._score(selection, query) for selection in selections])
+
+        shortlist = min(top_k * self.rerank_factor if self.rerank_vectors is not None else top_k, len(rows))
+        keep = np.argpartition(-scores, shortlist - 1)[:shortlist]
+        rows, scores = rows[keep], scores[keep]
+
+        if self.rerank_vectors is not None:
+            # Sorted rows read a memory-mapped matrix front to back
+            order = np.argsort(rows)
+            rows = rows[order]
+            scores = _normalize(self.rerank_vectors[rows]) @ query
+
+        top_k = min(top_k, len(rows))
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+
+        return [
+            {'id': self.keys[rows[i]], 'score': float(scores[i]), 'metadata': self.metadata[rows[i]]}
+            for i in best
+        ]
+
+    def _score(self, rows, query: np.ndarray) -> np.ndarray:
+        """Approximate cosine similarity of the query with the given rows (array or slice)"""
+        if self.precision == 'int8':
+            return self.codes[rows].astype(np.float32) @ (query * self.scales)
+
+        differing = np.bitwise_xor(self.codes[rows], np.packbits(query > 0))
+        if hasattr(np, 'bitwise_count'):
+            distances = np.bitwise_count(differing).sum(axis=1, dtype=np.int32)
+        else:
+            distances = _POPCOUNT[differing].sum(axis=1, dtype=np.int32)
+        return 1.0 - 2.0 * distances / self.dimension
+
+def _normalize(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
@@ -2,9 +2,12 @@ import boto3
 import json
 from typing import List, Dict, Any
 from datetime import datetime
+from source.bedrock.embedding_profile import DEFAULT_PROFILE
+from source.vector_store.chunk_hits import collapse_chunk_hits
+from source.vector_store.vector_writer import VectorWriter
 
 class S3VectorsNative:
-    def __init__(self, region='us-east-1', vector_bucket_name=None, index_name='jira-tickets'):
+    def __init__(self, region='us-east-1', vector_bucket_name=None, index_name='jira-tickets', profile=None):
         try:
             self.s3vectors_client = boto3.client('s3vectors', region_name=region)
             print(f"✅ S3 Vectors client created successfully in {region}")
@@ -14,7 +17,8 @@ class S3VectorsNative:
             raise e
         self.vector_bucket_name = vector_bucket_name
         self.index_name = index_name
-        self.dimension = 1536  # Titan v1 dimension
+        # Must match the embeddings stored, so it comes from the shared profile
+        self.dimension = (profile or DEFAULT_PROFILE).dimensions
     
     def create_vector_store(self):
         """Create S3 Vector bucket and index"""
@@ -66,31 +70,33 @@ class S3VectorsNative:
                 }
                 vectors.append(vector_entry)
             
-            # Store vectors in batches of 100
-            batch_size = 100
-            for i in range(0, len(vectors), batch_size):
-                batch = vectors[i:i+batch_size]
-                
-                self.s3vectors_client.put_vectors(
-                    vectorBucketName=self.vector_bucket_name,
-                    indexName=self.index_name,
-                    vectors=batch
-                )
+            # Batches are sized by count and payload bytes, uploaded concurrently
+            report = VectorWriter(self.s3vectors_client, self.vector_bucket_name, self.index_name).write(vectors)
             
-            return True
+            for batch in report['batches']:
+                if batch['status'] != 'ok':
+                    print(f"Error storing batch {batch['batch']} ({batch['vectors']} vectors): {batch['error']}")
+            
+            return report['failed'] == 0
             
         except Exception as e:
             print(f"Error storing vectors: {str(e)}")
             return False
     
-    def search_similar(self, query_embedding: List[float], top_k: int = 10, filters: Dict = None) -> List[Dict[str, Any]]:
-        """Search for similar vectors with optional metadata filtering"""
+    def search_similar(self, query_embedding: List[float], top_k: int = 10, filters: Dict = None,
+                       aggregate: str = None, candidates: int = 30) -> List[Dict[str, Any]]:
+        """Search for similar vectors with optional metadata filtering.
+
+        With ``aggregate`` ('max' or 'sum'), ``candidates`` chunk hits are
+        fetched and collapsed into the top_k tickets.
+        """
         try:
             query_params = {
                 'vectorBucketName': self.vector_bucket_name,
                 'indexName': self.index_name,
                 'queryVector': {'float32': query_embedding},
-                'topK': top_k
+                'topK': max(top_k, candidates) if aggregate else top_k,
+                'returnMetadata': True
             }
             
             # Add metadata filters if provided
@@ -108,6 +114,8 @@ class S3VectorsNative:
                 }
                 results.append(result)
             
+            if aggregate:
+                return collapse_chunk_hits(results, aggregate=aggregate, top_k=top_k)
             return results
             
         except Exception as e:
@@ -0,0 +1,110 @@
+import json
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator
+from botocore.exceptions import ClientError, ConnectionError as BotocoreConnectionError
+from source.bedrock.embedding_engine import is_throttling_error
+
+# S3 Vectors accepts at most 500 vectors per PutVectors request and caps the
+# request payload; stay comfortably under the documented 20 MiB limit.
+MAX_BATCH_VECTORS = 500
+MAX_BATCH_BYTES = 16 * 1024 * 1024
+
+RETRYABLE_ERROR_CODES = {'InternalServerException', 'InternalServerError', 'RequestTimeout', 'ServiceUnavailable'}
+
+def is_retryable_error(error: Exception) -> bool:
+    """Throttling, 5xx and connection errors are worth retrying"""
+    if is_throttling_error(error) or isinstance(error, BotocoreConnectionError):
+        return True
+    if isinstance(error, ClientError):
+        return error.response.get('Error', {}).get('Code') in RETRYABLE_ERROR_CODES
+    return False
+
+class VectorWriter:
+    """Size-aware, concurrent ``put_vectors`` writer.
+
+    Vectors are packed into batches bounded by both count and serialized
+    size, uploaded by a small thread pool, and each batch is retried on its
+    own with jittered backoff, so one bad batch never resends (or sinks) the
+    rest. ``write`` returns a per-batch report.
+    """
+
+    def __init__(self, s3vectors_client, vector_bucket_name: str, index_name: str,
+                 max_batch_vectors: int = MAX_BATCH_VECTORS, max_batch_bytes: int = MAX_BATCH_BYTES,
+                 max_workers: int = 4, max_retries: int = 5, base_delay: float = 0.5, max_delay: float = 20.0):
+        self.s3vectors_client = s3vectors_client
+        self.vector_bucket_name = vector_bucket_name
+        self.index_name = index_name
+        self.max_batch_vectors = max_batch_vectors
+        self.max_batch_bytes = max_batch_bytes
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def make_batches(self, vectors: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        """Group vectors into batches bounded by count and serialized bytes"""
+        batch, batch_bytes = [], 0
+        for vector in vectors:
+            size = len(json.dumps(vector, separators=(',', ':')))
+            if batch and (len(batch) >= self.max_batch_vectors or batch_bytes + size > self.max_batch_bytes):
+                yield batch
+                batch, batch_bytes = [], 0
+            batch.append(vector)
+            batch_bytes += size
+        if batch:
+            yield batch
+
+    def write(self, vectors: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Upload vectors and report per-batch outcomes.
+
+        Returns ``{'stored', 'failed', 'seconds', 'batches': [...]}`` where each
+        batch entry has ``vectors``, ``attempts``, ``status`` and ``error``.
+        Failed batches keep their ``keys`` so callers can retry or dead-letter
+        them.
+        """
+        started = time.time()
+        report = {'stored': 0, 'failed': 0, 'seconds': 0.0, 'batches': []}
+        window = deque()
+
+        def collect(future):
+            result = future.result()
+            report['batches'].append(result)
+            if result['status'] == 'ok':
+                report['stored'] += result['vectors']
+            else:
+                report['failed'] += result['vectors']
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for number, batch in enumerate(self.make_batches(vectors)):
+                window.append(executor.submit(self._put_batch, number, batch))
+                # Bound in-flight batches so huge inputs stream through
+                if len(window) >= self.max_workers * 2:
+                    collect(window.popleft())
+            while window:
+                collect(window.popleft())
+
+        report['seconds'] = time.time() - started
+        return report
+
+    def _put_batch(self, number: int, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        result = {'batch': number, 'vectors': len(batch), 'attempts': 0, 'status': 'ok', 'error': None}
+
+        for attempt in range(self.max_retries + 1):
+            result['attempts'] = attempt + 1
+            try:
+                self.s3vectors_client.put_vectors(
+                    vectorBucketName=self.vector_bucket_name,
+                    indexName=self.index_name,
+                    vectors=batch
+                )
+                return result
+            except Exception as e:
+                if not is_retryable_error(e) or attempt == self.max_retries:
+                    result.update(status='failed', error=str(e), keys=[v['key'] for v in batch])
+                    return result
+                time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+
+        return result